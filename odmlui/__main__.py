@@ -9,19 +9,31 @@ import odmlui
 
 from .editor import register_stock_icons, EditorWindow
 from .helpers import path_to_uri
+from .treemodel import store_model
 
 pygtkcompat.enable()
 pygtkcompat.enable_gtk(version='3.0')
 
 
-def main(filenames=None, debug=False):
+def main(filenames=None, debug=False, cache=True, store_models=False):
     """
     Start the editor, with a new empty document
     or load all passed *filenames* as tabs.
+    The files are loaded in parallel in the background, the tabs
+    are shown in order as soon as their documents are available.
 
-    Returns the tab object.
+    If *cache* is False, parsed documents are not cached on disk.
+    If *store_models* is True, the sections and properties are displayed
+    by the gtk.TreeStore based models of treemodel.store_model.
+
+    Returns the tab objects.
     """
     odmlui.DEBUG = debug
+    if not cache:
+        EditorWindow.document_cache = None
+    if store_models:
+        EditorWindow.section_model_class = store_model.SectionStore
+        EditorWindow.property_model_class = store_model.PropertyStore
     register_stock_icons()
     editor = EditorWindow()
 
@@ -34,7 +46,7 @@ def main(filenames=None, debug=False):
             filenames[i] = os.path.abspath(file_path)
 
     file_uris = list(map(path_to_uri, filenames))
-    tabs = list(map(editor.load_document, file_uris))
+    tabs = editor.load_documents(file_uris)
 
     if not filenames:
         editor.welcome()
@@ -59,8 +71,13 @@ def run():
     parser = ArgumentParser()
     parser.add_argument('--debug', help='Print debug messages', action='store_true')
     parser.add_argument('--files', nargs='+', default=[], help='List of files to open')
+    parser.add_argument('--no-cache', help='Do not cache parsed documents on disk',
+                        action='store_true')
+    parser.add_argument('--store-models', action='store_true',
+                        help='Display documents with gtk.TreeStore based models')
     args = parser.parse_args()
-    main(filenames=args.files, debug=args.debug)
+    main(filenames=args.files, debug=args.debug, cache=not args.no_cache,
+         store_models=args.store_models)
     gtk.main()
 
 
@@ -0,0 +1,410 @@
+"""
+The 'background_validation' module provides the 'BackgroundValidation' class.
+
+It validates an odml document in a worker thread, so large documents
+can be validated without blocking the GTK main loop. Once a document
+has been validated, only the objects touched by later changes are
+validated again.
+"""
+
+import threading
+import traceback
+
+from gi.repository import GLib
+
+import odml.validation
+
+from .treemodel import event
+
+
+def snapshot(document):
+    """
+    Clone *document* to be validated independently of further edits.
+
+    :return: the clone and a dict mapping the ids of all cloned objects
+             to their originals.
+    """
+    # The clones are not shown by any view, there is no need for change events.
+    with event.quiet():
+        clone = document.clone(keep_id=True)
+
+    mapping = {}
+
+    def add(src, dst):
+        mapping[id(dst)] = src
+        # the clones share the change handlers of their originals
+        dst._change_handler = None
+
+        for child_src, child_dst in zip(getattr(src, "properties", []),
+                                        getattr(dst, "properties", [])):
+            add(child_src, child_dst)
+        for child_src, child_dst in zip(getattr(src, "sections", []),
+                                        getattr(dst, "sections", [])):
+            add(child_src, child_dst)
+
+    add(document, clone)
+    return clone, mapping
+
+
+def partial_snapshot(objects):
+    """
+    Clone the odml sections and properties *objects* along with the context
+    their validation rules depend on: the direct children of sections,
+    the sibling properties of properties and the chain of parents
+    providing the repository. The children of the parents are left out.
+
+    :return: list of the clones of *objects* and a dict mapping the ids
+             of all cloned objects to their originals.
+    """
+    clones = {}
+    mapping = {}
+
+    def clone(src):
+        dst = clones.get(id(src))
+        if dst is not None:
+            return dst
+
+        if hasattr(src, "sections"):
+            dst = src.clone(children=False, keep_id=True)
+        else:
+            dst = src.clone(keep_id=True)
+        # the clones share the change handlers of their originals
+        dst._change_handler = None
+        clones[id(src)] = dst
+        mapping[id(dst)] = src
+
+        if src.parent is not None:
+            clone(src.parent).append(dst)
+        return dst
+
+    # The clones are not shown by any view, there is no need for change events.
+    with event.quiet():
+        for obj in objects:
+            if hasattr(obj, "sections"):
+                clone(obj)
+                for child in list(obj.properties) + list(obj.sections):
+                    clone(child)
+            else:
+                for prop in obj.parent.properties:
+                    clone(prop)
+
+    return [clones[id(obj)] for obj in objects], mapping
+
+
+def iter_objects(node):
+    """
+    yields *node* and all its subsections and properties
+    """
+    yield node
+    for prop in getattr(node, "properties", []):
+        yield prop
+    for sec in getattr(node, "sections", []):
+        for obj in iter_objects(sec):
+            yield obj
+
+
+def validate_object(obj, mapping=None):
+    """
+    Run the validation handlers of the single odml object *obj*.
+
+    :param mapping: dict mapping the ids of cloned objects to their
+                    originals as returned by snapshot().
+    :return: list of the validation messages of *obj*, bound to
+             the original objects if *mapping* is given.
+    """
+    validation = odml.validation.Validation(obj, validate=False)
+    validation.validate(obj)
+
+    if mapping is not None:
+        for err in validation.errors:
+            if isinstance(err.obj, list):
+                err.obj = [mapping.get(id(obj), obj) for obj in err.obj]
+            else:
+                err.obj = mapping.get(id(err.obj), err.obj)
+
+    return validation.errors
+
+
+def validate_snapshot(clone, mapping):
+    """
+    Validate all objects of the *clone* created by snapshot().
+
+    :return: dict mapping the ids of the original objects to tuples of
+             the object and its validation messages. Objects without
+             messages are left out.
+    """
+    results = {}
+    for obj in iter_objects(clone):
+        errors = validate_object(obj, mapping)
+        if errors:
+            orig = mapping[id(obj)]
+            results[id(orig)] = (orig, errors)
+    return results
+
+
+def validate_partial(clones, mapping, results):
+    """
+    Validate the *clones* created by partial_snapshot() and add their
+    messages to the per object *results* as returned by validate_snapshot().
+
+    :return: *results*
+    """
+    for obj in clones:
+        errors = validate_object(obj, mapping)
+        if errors:
+            orig = mapping[id(obj)]
+            results[id(orig)] = (orig, errors)
+    return results
+
+
+def create_validation(document, results):
+    """
+    :return: odml.validation.Validation of *document* holding
+             all messages of the per object *results*
+    """
+    validation = odml.validation.Validation(document, validate=False)
+    for _, errors in results.values():
+        validation.errors.extend(errors)
+    return validation
+
+
+class BackgroundValidation(object):
+    """
+    Revalidates *document* once it has not been changed for
+    *delay* milliseconds and passes the resulting
+    odml.validation.Validation to *callback* in the GTK main loop.
+
+    The first run validates a snapshot of the whole document in
+    a worker thread. Its result is discarded, if the document has been
+    changed in the meantime. In this case a new run is already pending.
+
+    The messages are kept per object. Later runs only validate a partial
+    snapshot of the objects touched by changes since the previous run
+    along with their parent sections, whose rules cover their children,
+    e.g. unique names, and the properties depending on their siblings.
+    Changes of the document itself or its top level sections are covered
+    by the rules of the document, e.g. unique ids, and validate a
+    snapshot of the whole document again.
+    """
+    delay = 500
+
+    def __init__(self, document, callback):
+        self.document = document
+        self.callback = callback
+        # incremented on each change, results of outdated runs are discarded
+        self.generation = 0
+        self.result_generation = None
+        self.result = None
+        self._timer = None
+        self._requests = []
+        # validation messages by object id and the objects to validate again
+        self.results = {}
+        self.dirty = {}
+        # the objects validated by runs that have not been delivered yet,
+        # validated again by the next run, if their run is discarded
+        self.pending = {}
+        self.full = True
+        # at most one run is in flight, changes arriving meanwhile
+        # start the next run once it has been delivered
+        self.running = False
+        self.rerun = False
+
+        document.add_change_handler(self.on_document_changed)
+
+    def on_document_changed(self, context):
+        """
+        schedule a new run after each change of the document
+        """
+        if not context.post_change:
+            return
+
+        # changes of private attributes e.g. the highlighting of
+        # validation errors are no edits of the document
+        if context.action == "set" and context.val[0].startswith("_"):
+            return
+
+        self.generation += 1
+        self.touch(context)
+        self.schedule()
+
+    def touch(self, context):
+        """
+        mark the objects affected by a change to be validated again
+        """
+        if context.action == "reset":
+            self.full = True
+            return
+
+        obj = context.obj
+        if context.action == "reorder":
+            obj = obj.parent
+
+        if context.action in ("append", "insert"):
+            if hasattr(context.val, "_detached"):
+                obj = context.val  # a Value, validated with its property
+            else:
+                for child in iter_objects(context.val):
+                    self.mark(child)
+
+        if context.action == "remove" and not hasattr(context.val, "_detached"):
+            for child in iter_objects(context.val):
+                self.results.pop(id(child), None)
+                self.dirty.pop(id(child), None)
+                self.pending.pop(id(child), None)
+
+        if hasattr(obj, "_detached"):
+            obj = obj.parent  # Values are validated with their property
+
+        if hasattr(obj, "dependency") and obj.parent is not None:
+            # properties may depend on their siblings
+            for prop in obj.parent.properties:
+                if prop.dependency is not None:
+                    self.mark(prop)
+
+        self.mark(obj)
+        if getattr(obj, "parent", None) is not None:
+            self.mark(obj.parent)
+
+    def mark(self, obj):
+        if obj is self.document:
+            self.full = True
+        else:
+            self.dirty[id(obj)] = obj
+
+    def schedule(self, delay=None):
+        """
+        (re)start the timer of the next run
+        """
+        if self._timer is not None:
+            GLib.source_remove(self._timer)
+        if delay is None:
+            delay = self.delay
+        self._timer = GLib.timeout_add(delay, self.start)
+
+    def start(self):
+        """
+        start a run validating the current state of the document
+        """
+        self._timer = None
+        if self.running:
+            self.rerun = True
+            return False
+
+        self.running = True
+        if not self.full:
+            self.update()
+            return False
+
+        self.dirty = {}
+        self.pending = {}
+        clone, mapping = snapshot(self.document)
+
+        thread = threading.Thread(target=self.run, daemon=True,
+                                  args=(clone, mapping, self.generation))
+        thread.start()
+        return False
+
+    def run(self, clone, mapping, generation):
+        """
+        validate the snapshot in the worker thread
+        """
+        try:
+            results = validate_snapshot(clone, mapping)
+        except Exception:
+            # discard the run, but free the worker for the next one
+            traceback.print_exc()
+            results, generation = None, None
+        GLib.idle_add(self.deliver, results, generation)
+
+    def update(self):
+        """
+        validate the objects touched since the last run in the worker thread
+        """
+        thread = threading.Thread(target=self.run_update, daemon=True,
+                                  args=self.prepare_update() + (self.generation,))
+        thread.start()
+
+    def prepare_update(self):
+        """
+        :return: the partial snapshot of the objects touched since the last
+                 run and the results of the last run without their messages
+        """
+        self.pending.update(self.dirty)
+        self.dirty = {}
+
+        results = dict(self.results)
+        objects = []
+        for key, obj in list(self.pending.items()):
+            results.pop(key, None)
+            if getattr(obj, "document", None) is not self.document:
+                del self.pending[key]  # not part of the document anymore
+            else:
+                objects.append(obj)
+
+        clones, mapping = partial_snapshot(objects)
+        return clones, mapping, results
+
+    def run_update(self, clones, mapping, results, generation):
+        """
+        validate the partial snapshot in the worker thread
+        """
+        try:
+            results = validate_partial(clones, mapping, results)
+        except Exception:
+            traceback.print_exc()
+            results, generation = None, None
+        GLib.idle_add(self.deliver, results, generation)
+
+    def deliver(self, results, generation):
+        """
+        pass the result of a run to the callback in the main loop
+        and start the next run, if changes have arrived meanwhile
+        """
+        self.running = False
+        if generation == self.generation:
+            self.results = results
+            self.pending = {}
+            self.full = False
+            validation = create_validation(self.document, results)
+            self.result = validation
+            self.result_generation = generation
+            self.callback(validation)
+
+            requests, self._requests = self._requests, []
+            for callback in requests:
+                callback(validation)
+
+        if self.rerun:
+            self.rerun = False
+            if generation != self.generation:
+                self.start()
+        return False
+
+    def request(self, callback):
+        """
+        start a run right away and pass its result to *callback* once
+        """
+        self._requests.append(callback)
+        self.schedule(0)
+
+    @property
+    def current(self):
+        """
+        the result of the last run, if the document has not
+        been changed since, otherwise None
+        """
+        if self.result_generation == self.generation:
+            return self.result
+        return None
+
+    def stop(self):
+        """
+        cancel pending runs and stop following the document
+        """
+        if self._timer is not None:
+            GLib.source_remove(self._timer)
+            self._timer = None
+        self.generation += 1
+        self._requests = []
+        self.rerun = False
+        self.document.remove_change_handler(self.on_document_changed)
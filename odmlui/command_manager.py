@@ -5,16 +5,45 @@ This class provides the core functionality of re- and undo
 actions per tab / document in the application.
 """
 
+import time
+
+from contextlib import contextmanager
+
 
 class CommandManager(object):
     """
     The CommandManager class provides a re- and undo-stack
     of commands and the methods to properly apply the
     commands in each stack.
+
+    The undo history is bounded by *max_undo_steps* commands and by
+    the approximate memory *max_undo_size* (in bytes) retained by its
+    commands. If either is exceeded, the oldest commands are dropped.
+    A limit of None disables it.
+
+    Commands executed within *merge_window* seconds after the previous
+    command are merged into it, if the previous command supports it
+    (see Command.merge), e.g. when typing repeatedly into the same cell.
     """
-    def __init__(self):
+    max_undo_steps = 1000
+    max_undo_size = 64 * 1024 * 1024
+    merge_window = 1.0
+
+    def __init__(self, max_undo_steps=None, max_undo_size=None):
+        if max_undo_steps is not None:
+            self.max_undo_steps = max_undo_steps
+        if max_undo_size is not None:
+            self.max_undo_size = max_undo_size
+
         self.undo_stack = []
         self.redo_stack = []
+        # the memory estimates of the commands on the undo stack
+        self.undo_sizes = []
+        self.undo_size = 0
+        # the number of commands dropped from the undo history
+        self.evicted = 0
+        # the time the last command was executed, if it can be merged with
+        self.merge_time = None
 
     def execute(self, cmd, redo=False):
         """
@@ -29,12 +58,27 @@ class CommandManager(object):
             self.enable_redo(enable=False)
 
         try:
-            cmd()
+            with self.transaction():
+                cmd()
         except Exception as err:
             self.error_func(err)
             raise
 
+        now = time.time()
+        if not redo and self.merge_time is not None and \
+                now - self.merge_time <= self.merge_window and \
+                self.undo_stack[-1].merge(cmd):
+            self.merge_time = now
+            self.undo_size -= self.undo_sizes.pop()
+            self.undo_sizes.append(self.undo_stack[-1].memory_size())
+            self.undo_size += self.undo_sizes[-1]
+            return
+
         self.undo_stack.append(cmd)
+        self.undo_sizes.append(cmd.memory_size())
+        self.undo_size += self.undo_sizes[-1]
+        self.evict()
+        self.merge_time = None if redo else now
         self.enable_undo()
 
     def undo(self):
@@ -44,6 +88,8 @@ class CommandManager(object):
         the undo method of the Command object.
         """
         cmd = self.undo_stack.pop()
+        self.undo_size -= self.undo_sizes.pop()
+        self.merge_time = None
         self.redo_stack.append(cmd)
 
         if not self.undo_stack:
@@ -52,7 +98,8 @@ class CommandManager(object):
         self.enable_redo()
 
         try:
-            cmd.undo()
+            with self.transaction():
+                cmd.undo()
         except Exception as err:
             self.error_func(err)
             raise
@@ -70,6 +117,28 @@ class CommandManager(object):
 
         self.enable_undo()
 
+    def evict(self):
+        """
+        *evict* drops the oldest commands from the undo stack until it
+        fits into *max_undo_steps* and *max_undo_size*. The most recent
+        command is always kept.
+        """
+        while len(self.undo_stack) > 1 and (
+                (self.max_undo_steps is not None and
+                 len(self.undo_stack) > self.max_undo_steps) or
+                (self.max_undo_size is not None and
+                 self.undo_size > self.max_undo_size)):
+            self.undo_stack.pop(0)
+            self.undo_size -= self.undo_sizes.pop(0)
+            self.evicted += 1
+
+    def checkpoint(self):
+        """
+        *checkpoint* makes sure the next command is not merged into the
+        previous one, e.g. after the document has been saved.
+        """
+        self.merge_time = None
+
     def reset(self):
         """
         *reset* clears all objects from both undo and redo stack.
@@ -78,18 +147,31 @@ class CommandManager(object):
         self.enable_redo(enable=False)
         self.undo_stack = []
         self.redo_stack = []
+        self.undo_sizes = []
+        self.undo_size = 0
+        self.evicted = 0
+        self.merge_time = None
 
     def __len__(self):
-        return len(self.undo_stack)
+        """
+        the number of commands executed since the last reset including
+        those already dropped from the undo history, i.e. the position
+        in the editing history
+        """
+        return self.evicted + len(self.undo_stack)
 
     @property
     def is_modified(self):
         """
-        *is_modified* returns True if the undo stack contains any object.
+        *is_modified* returns True if any command has been executed
+        since the last reset.
         """
-        return bool(self.undo_stack)
+        return bool(len(self))
 
-    can_undo = is_modified
+    @property
+    def can_undo(self):
+        """*can_undo* returns True if the undo stack contains any object"""
+        return bool(self.undo_stack)
 
     @property
     def can_redo(self):
@@ -108,6 +190,16 @@ class CommandManager(object):
         """
         pass
 
+    @contextmanager
+    def transaction(self):
+        """
+        *transaction* provides the context in which commands are executed
+        and undone, e.g. to batch the change notifications of a command.
+
+        The actual method is set on the class at the point of usage.
+        """
+        yield
+
     def error_func(self, err):
         """
         *error_func* provides feedback to the user, if an error occurs.
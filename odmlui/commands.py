@@ -4,6 +4,64 @@ together with the CommandManager class to enable execute and undo
 actions within the Application.
 """
 
+import sys
+
+from odml.base import BaseObject
+from odml.doc import BaseDocument
+
+
+def estimate_size(obj):
+    """
+    returns the approximate memory in bytes exclusively retained by *obj*.
+
+    odml nodes, that are still part of a document, are not counted,
+    detached nodes are counted along with all their children and values.
+    Commands are asked for their own memory_size.
+    """
+    if isinstance(obj, Command):
+        return obj.memory_size()
+
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj.values())
+
+    if isinstance(obj, BaseObject):
+        if isinstance(obj, BaseDocument):
+            # the document is retained by its tab anyway
+            return 0
+        if hasattr(obj, "_detached"):
+            # a Value wrapper only retains its content, if it is
+            # not part of its property
+            if obj._detached:
+                return sys.getsizeof(obj) + sys.getsizeof(obj.pseudo_values)
+            return 0
+        if obj.parent is None:
+            return node_size(obj)
+        return 0
+
+    if hasattr(obj, "__dict__"):
+        # any other object e.g. a callback is shared with the application
+        return 0
+
+    return sys.getsizeof(obj)
+
+
+def node_size(node):
+    """
+    returns the approximate memory in bytes of the odml *node*
+    and all its children
+    """
+    size = sys.getsizeof(node) + sys.getsizeof(getattr(node, "__dict__", None))
+    for val in getattr(node, "_values", None) or []:
+        size += sys.getsizeof(val)
+    for child in getattr(node, "properties", None) or []:
+        size += node_size(child)
+    for child in getattr(node, "sections", None) or []:
+        size += node_size(child)
+    return size
+
 
 class Command(object):
     """
@@ -37,6 +95,22 @@ class Command(object):
     def _undo(self):
         pass
 
+    def memory_size(self):
+        """
+        returns the approximate memory in bytes retained by the command,
+        e.g. old values or removed objects kept for undo
+        """
+        return sys.getsizeof(self) + estimate_size(self.__dict__)
+
+    def merge(self, cmd):
+        """
+        Merge the already executed command *cmd* into this command,
+        so undoing this command also undoes *cmd*.
+
+        Returns False, if the commands cannot be merged.
+        """
+        return False
+
     def __repr__(self):
         return "<%s %s>" % (self.__class__.__name__, ', '.join(
             ["%s=%s" % (k, v) for k, v in self.__dict__.items()]))
@@ -104,6 +178,51 @@ class ChangeValue(Command):
 
         setattr(self.object, self.attr[0], self.old_value[self.attr[0]])
 
+    def merge(self, cmd):
+        """
+        Successive changes of the same attribute of the same object are
+        merged keeping the first old value and the last new value.
+        """
+        if not isinstance(cmd, ChangeValue) or cmd.object is not self.object or \
+                cmd.attr != self.attr:
+            return False
+
+        self.new_value = cmd.new_value
+        return True
+
+
+class SetPropertyValue(Command):
+    """
+    SetPropertyValue(prop=, index=, new_value=)
+
+    Supported kwargs: *prop* odml.Property, *index* position of the value,
+                      *new_value* the new content of the value
+
+    Replaces a single value of a property in place. Only the old and
+    the new content of the value are kept for the undo mechanism.
+    """
+    _required = ['prop', 'index', 'new_value']
+
+    def __init__(self, *args, **kwargs):
+        for req in self._required:
+            if req not in kwargs:
+                raise TypeError("Missing positional argument %s" % req)
+
+        self.prop = None
+        self.index = None
+        self.new_value = None
+        self.old_value = None
+
+        super(SetPropertyValue, self).__init__(*args, **kwargs)
+
+    def _execute(self):
+        val = self.prop.pseudo_values[self.index]
+        self.old_value = val.pseudo_values
+        val.pseudo_values = self.new_value
+
+    def _undo(self):
+        self.prop.pseudo_values[self.index].pseudo_values = self.old_value
+
 
 class AppendValue(Command):
     """
@@ -177,6 +296,16 @@ class DeleteObject(Command):
         """
         self.append_cmd._execute()
 
+    def memory_size(self):
+        """
+        returns the approximate memory in bytes retained by the command,
+        the removed object is shared with append_cmd and counted once
+        """
+        attributes = dict(self.__dict__)
+        if attributes.get("obj") is self.append_cmd.val:
+            del attributes["obj"]
+        return sys.getsizeof(self) + estimate_size(attributes)
+
 
 class ReorderObject(Command):
     """
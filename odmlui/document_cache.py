@@ -0,0 +1,161 @@
+"""
+The 'document_cache' module provides the 'DocumentCache' class.
+
+It keeps pickled snapshots of parsed odml documents on disk,
+so reopening an unchanged file does not require parsing it again.
+"""
+
+import hashlib
+import os
+import pickle
+import stat as stat_mode
+import tempfile
+
+import odml
+
+from .info import VERSION
+
+
+class DocumentCache(object):
+    """
+    DocumentCache stores parsed documents in *directory*.
+
+    The entries are keyed by path, size, modification time and content
+    hash of the parsed file, a changed file is never served from the cache.
+    The odml and odmlui versions are part of the key, documents pickled
+    by other versions are parsed again.
+    Once the entries exceed *max_size* bytes, the least recently used
+    ones are removed.
+    """
+    max_size = 256 * 1024 * 1024
+    suffix = ".odml.pickle"
+    chunk_size = 1024 * 1024
+
+    def __init__(self, directory, max_size=None):
+        self.directory = directory
+        if max_size is not None:
+            self.max_size = max_size
+
+    def key(self, file_path):
+        """
+        :return: the cache key of the current state of the file *file_path*
+        """
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+
+        content = hashlib.sha256()
+        with open(file_path, "rb") as src:
+            for chunk in iter(lambda: src.read(self.chunk_size), b""):
+                content.update(chunk)
+
+        key = hashlib.sha256()
+        for part in (odml.__version__, VERSION, file_path, str(stat.st_size),
+                     str(stat.st_mtime_ns), content.hexdigest()):
+            key.update(part.encode("utf-8"))
+            key.update(b"\0")
+        return key.hexdigest()
+
+    def is_private(self):
+        """
+        True if the cache directory is only writable by the current user.
+        The entries are unpickled, a directory others could plant
+        entries in is not used. Neither is a directory others could
+        replace, the parent directory must be owned by the current user
+        or root and, unless it is sticky like /tmp, not writable by others.
+        """
+        try:
+            stat = os.stat(self.directory)
+            parent = os.stat(os.path.dirname(os.path.abspath(self.directory)))
+        except OSError:
+            return False
+
+        if hasattr(os, "getuid"):
+            if stat.st_uid != os.getuid() or parent.st_uid not in (os.getuid(), 0):
+                return False
+        if stat.st_mode & 0o022:
+            return False
+        return not parent.st_mode & 0o022 or bool(parent.st_mode & stat_mode.S_ISVTX)
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def load(self, key):
+        """
+        :return: the document cached for *key* or None
+        """
+        if not self.is_private():
+            return None
+
+        entry_path = self.entry_path(key)
+        try:
+            with open(entry_path, "rb") as src:
+                document = pickle.load(src)
+            # the modification time of an entry marks its last use
+            os.utime(entry_path, None)
+        except Exception:
+            # a missing, incomplete or outdated entry is parsed again
+            return None
+        return document
+
+    def store(self, key, document):
+        """
+        Store *document* for *key* and evict the least recently used
+        entries, if the cache exceeds *max_size*. The entry is written
+        to a temporary file first, so concurrent readers never see an
+        incomplete entry.
+        """
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        if not self.is_private():
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as dst:
+                pickle.dump(document, dst, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.entry_path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def entries(self):
+        """
+        :return: list of (last use, size, path) of all entries
+        """
+        if not os.path.isdir(self.directory):
+            return []
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # removed concurrently
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """
+        remove the least recently used entries until
+        the cache fits into *max_size*
+        """
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
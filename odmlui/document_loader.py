@@ -0,0 +1,272 @@
+"""
+The 'document_loader' module provides the 'DocumentLoader' class.
+
+It parses an odml file and prepares the document for the editor
+in a worker thread or a worker process, so large files can be opened
+without blocking the GTK main loop.
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+
+from concurrent.futures import ProcessPoolExecutor
+
+from gi.repository import GLib
+
+import odml
+
+from odml.tools.odmlparser import ODMLReader
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities in worker processes as well.
+import odmlui.treemodel.mixin
+
+from .helpers import handle_section_import
+from .treemodel import event
+
+
+# the share of parsing in the progress of load_document(),
+# the rest is spent preparing the sections for the editor
+PARSE_SHARE = 0.5
+
+
+class LoadCancelled(Exception):
+    """
+    raised by load_document() if loading has been cancelled
+    """
+    pass
+
+
+class ProgressFile(object):
+    """
+    Binary file *file_path* opened for reading, which passes the fraction
+    read so far to *progress* each time another percent has been read.
+    Parsers reading the file in chunks report their progress this way.
+    """
+
+    def __init__(self, file_path, progress):
+        self._file = open(file_path, "rb")
+        self._size = os.fstat(self._file.fileno()).st_size
+        self._progress = progress
+        self._percent = -1
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        if self._size:
+            percent = 100 * self._file.tell() // self._size
+            if percent != self._percent:
+                self._percent = percent
+                self._progress(percent / 100.0)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def parse_document(file_path, parser, progress):
+    """
+    Same as odml.load(file_path, parser).
+
+    :param progress: called with the fraction of the file parsed so far.
+                     XML files are parsed while they are read in chunks,
+                     other formats are read at once, it is called with None.
+    :return: the parsed odml.Document
+    """
+    if parser != "XML":
+        progress(None)
+        return odml.load(file_path, parser)
+
+    src = ProgressFile(file_path, progress)
+    try:
+        document = ODMLReader(parser).from_file(src)
+    finally:
+        src.close()
+    # only set by odml for documents parsed from a file path
+    document.origin_file_name = os.path.basename(file_path)
+    return document
+
+
+def load_document(file_path, parser, progress=None, cancelled=None, cache=None):
+    """
+    Parse the odml file *file_path* and initialize the document
+    for the editor, i.e. resolve links and add the pseudo_values
+    to all Properties.
+
+    :param progress: called with the fraction done (or None while
+                     it is unknown) and a description of each step.
+    :param cancelled: threading.Event aborting the load with
+                      LoadCancelled once it is set.
+    :param cache: odmlui.document_cache.DocumentCache holding the
+                  parsed documents of unchanged files.
+    :return: the loaded odml.Document
+    """
+    def step(fraction, text):
+        if cancelled is not None and cancelled.is_set():
+            raise LoadCancelled()
+        if progress is not None:
+            progress(fraction, text)
+
+    # No view follows the document yet, there is no need for change events.
+    with event.quiet():
+        document = key = None
+        if cache is not None:
+            step(None, "Reading cache")
+            key = cache.key(file_path)
+            document = cache.load(key)
+
+        if document is None:
+            def parsed(fraction):
+                if fraction is not None:
+                    fraction *= PARSE_SHARE
+                step(fraction, "Parsing")
+
+            document = parse_document(file_path, parser, parsed)
+            if cache is not None:
+                # The links are resolved again on each load,
+                # linked and included content may have changed.
+                try:
+                    cache.store(key, document)
+                except Exception as exc:
+                    print("[Warning] Document not cached: %s" % exc)
+
+        step(PARSE_SHARE, "Resolving links")
+        document.finalize()
+
+        # Make sure all Properties within all sections are properly
+        # initialized with the "pseudo_values" attribute.
+        sections = document.sections
+        for i, sec in enumerate(sections):
+            step(PARSE_SHARE + (1 - PARSE_SHARE) * i / len(sections),
+                 "Preparing section '%s'" % sec.name)
+            handle_section_import(sec)
+
+        step(1.0, "Done")
+
+    return document
+
+
+def create_process_pool(jobs):
+    """
+    :return: concurrent.futures.ProcessPoolExecutor for *jobs* DocumentLoaders
+             or None, if the workers cannot be spawned. The documents are
+             loaded in worker threads then.
+
+    The workers are spawned rather than forked from the
+    running GTK application. The start method of the workers
+    can only be chosen as of Python 3.7.
+    """
+    if sys.version_info < (3, 7):
+        return None
+
+    return ProcessPoolExecutor(max_workers=max(1, min(jobs, os.cpu_count() or 1)),
+                               mp_context=multiprocessing.get_context("spawn"))
+
+
+class DocumentLoader(object):
+    """
+    Loads the odml file *file_path* in a worker thread or, if an
+    *executor* like the one of create_process_pool() is given, in one
+    of its workers. The loaded document is passed back pickled then.
+
+    Unchanged files are read from the DocumentCache *cache*, if given.
+
+    *progress* is called in the GTK main loop with the fraction done
+    and a description of the current step. Once loading is complete,
+    *callback* is called in the main loop with the document and None
+    or, if loading failed, with None and the exception.
+    Neither is called anymore after cancel().
+    Worker processes cannot report their progress.
+    """
+
+    def __init__(self, file_path, parser, callback, progress=None, executor=None,
+                 cache=None):
+        self.file_path = file_path
+        self.parser = parser
+        self.cache = cache
+        self.callback = callback
+        self.progress = progress
+        self.executor = executor
+        self.cancelled = threading.Event()
+        self._thread = None
+        self._future = None
+
+    def start(self):
+        if self.executor is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+            return
+
+        self.deliver_progress(None, "Parsing")
+        self._future = self.executor.submit(load_document, self.file_path, self.parser,
+                                            cache=self.cache)
+        self._future.add_done_callback(self.on_future_done)
+
+    def run(self):
+        """
+        load the document in the worker thread
+        """
+        document = error = None
+        try:
+            document = load_document(self.file_path, self.parser,
+                                     self.report, self.cancelled, self.cache)
+        except LoadCancelled:
+            return
+        except Exception as exc:
+            error = exc
+
+        GLib.idle_add(self.deliver, document, error)
+
+    def on_future_done(self, future):
+        """
+        pass the document loaded by a worker process on to the main loop
+        """
+        if future.cancelled():
+            return
+
+        document = error = None
+        try:
+            document = future.result()
+        except Exception as exc:
+            error = exc
+
+        GLib.idle_add(self.deliver, document, error)
+
+    def report(self, fraction, text):
+        GLib.idle_add(self.deliver_progress, fraction, text)
+
+    def deliver_progress(self, fraction, text):
+        """
+        pass the progress of the worker to *progress* in the main loop
+        """
+        if self.progress is not None and not self.cancelled.is_set():
+            self.progress(fraction, text)
+        return False
+
+    def deliver(self, document, error):
+        """
+        pass the result of the worker to *callback* in the main loop
+        """
+        if not self.cancelled.is_set():
+            self.callback(document, error)
+        return False
+
+    def cancel(self):
+        """
+        stop loading, the result of a parse already
+        running in the worker is discarded
+        """
+        self.cancelled.set()
+        if self._future is not None:
+            # a file still waiting for a worker is not loaded at all
+            self._future.cancel()
+
+    def wait(self):
+        """
+        block until the worker is done
+        """
+        if self._thread is not None:
+            self._thread.join()
+        if self._future is not None and not self._future.cancelled():
+            self._future.exception()
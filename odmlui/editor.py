@@ -5,19 +5,16 @@ import tempfile
 
 from distutils.version import LooseVersion as CheckVer
 
-import time
 import threading
 from gi.repository import GLib, GObject
 
 import pygtkcompat
 
 from odml.property import BaseProperty
-import odml.terminology as terminology
-from odml.terminology import cache_load
 
 import odmlui.treemodel.mixin
 from odmlui.info import AUTHOR, CONTACT, COPYRIGHT, HOMEPAGE, VERSION, ODMLTABLES_VERSION
-from odmlui.treemodel import section_model, value_model
+from odmlui.treemodel import value_model
 
 import gtk
 import gobject
@@ -25,15 +22,19 @@ import gobject
 from .attribute_view import AttributeView
 from .chooser_dialog import OdmlChooserDialog
 from .document_registry import DocumentRegistry
+from .document_cache import DocumentCache
+from .document_loader import create_process_pool
 from .editor_tab import EditorTab
 from .helpers import uri_to_path, get_extension, get_parser_for_file_type, \
         get_parser_for_uri, get_conda_root, run_odmltables
 from .info_bar import EditorInfoBar
-from .message_dialog import DecisionDialog, WaitDialog
+from .loading_bar import LoadingBar
+from .message_dialog import DecisionDialog, ErrorDialog, WaitDialog
 from .navigation_bar import NavigationBar
 from .property_view import PropertyView
 from .scrolled_window import ScrolledWindow
 from .section_view import SectionView
+from .terminology_cache import TerminologyWarmup, refresh_repository
 from .wizard import DocumentWizard
 
 pygtkcompat.enable()
@@ -188,11 +189,22 @@ def gui_action(name, tooltip=None, stock_id=None, label=None, accelerator=None):
 class EditorWindow(gtk.Window):
     odMLHomepage = HOMEPAGE
     registry = DocumentRegistry()
+    # parsed documents of recently opened files, None disables the cache.
+    # Each user gets a directory of their own in the shared CACHE_DIR.
+    document_cache = DocumentCache(os.path.join(
+        CACHE_DIR, ("documents-%d" % os.getuid()) if hasattr(os, "getuid") else "documents"))
+    # loads the terminologies of the documents in the background
+    terminology_warmup = None
+    # the tree model classes of the section and the property view,
+    # None uses the default models of the views
+    section_model_class = None
+    property_model_class = None
     editors = set()
     welcome_disabled_actions = ["Save", "SaveAs", "Undo", "Redo", "NewSection",
                                 "NewProperty", "NewValue", "Delete", "CloneTab",
                                 "Validate", "odMLTablesCompare", "odMLTablesConvert",
                                 "odMLTablesFilter", "odMLTablesMerge", "RefreshCache"]
+    _document = None  # document of the current tab, see update_model
 
     def __init__(self, parent=None):
         gtk.Window.__init__(self)
@@ -284,7 +296,7 @@ class EditorWindow(gtk.Window):
         hpaned.show()
         hpaned.set_position(150)
 
-        section_tv = SectionView(self.registry)
+        section_tv = SectionView(self.registry, self.section_model_class)
         section_tv.execute = self.execute
         section_tv.on_section_change = self.on_section_change
         section_view = gtk.VBox(homogeneous=False, spacing=0)
@@ -295,7 +307,7 @@ class EditorWindow(gtk.Window):
         section_view.show()
         hpaned.add1(section_view)
 
-        property_tv = PropertyView(self.registry)
+        property_tv = PropertyView(self.registry, self.property_model_class)
         property_tv.execute = self.execute
         property_tv.on_property_select = self.on_object_select
         property_view = gtk.VBox(homogeneous=False, spacing=0)
@@ -346,6 +358,15 @@ class EditorWindow(gtk.Window):
 
         self.Tab = Tab
 
+        # progress of the documents loaded in the background
+        loading_box = gtk.VBox(homogeneous=False, spacing=0)
+        loading_box.show()
+        self._loading_box = loading_box
+        table.attach(loading_box,
+                     0, 2, 2, 3,
+                     gtk.EXPAND | gtk.FILL, 0,
+                     0, 0)
+
         notebook = gtk.Notebook()
         notebook.connect("switch-page", self.on_tab_select)
         notebook.connect("create-window", self.on_new_tab_window)
@@ -368,6 +389,12 @@ class EditorWindow(gtk.Window):
 
         self.show_all()
 
+        if EditorWindow.terminology_warmup is None:
+            # the terminologies of recently used files are likely needed soon
+            EditorWindow.terminology_warmup = TerminologyWarmup(self.on_terminology_ready)
+            self.terminology_warmup.prefetch_files(
+                [uri_to_path(i.get_uri()) for i in self.recent_odml_files()])
+
     def mktab(self, tab):
         new_tab = self.Tab()
         new_tab.tab = tab
@@ -446,6 +473,24 @@ class EditorWindow(gtk.Window):
             self.enable_action(curr_action, False)
 
         # display recently used files
+        recent_odml_files = self.recent_odml_files()
+        if recent_odml_files:
+            text += "\n\nOr open a <b>recently used file</b>:\n"
+            text += "\n".join([u"\u2022 <a href='%s'>%s</a>" %
+                               (i.get_uri(), i.get_display_name())
+                               for i in recent_odml_files])
+
+        page.set_markup(text)
+        page.connect("activate-link", self.welcome_action)
+        page.show()
+        self.notebook.set_show_tabs(False)
+        self.notebook.append_page(page)
+
+    @staticmethod
+    def recent_odml_files(max_recent_items=12):
+        """
+        returns the gtk.RecentInfo of the most recently used odml files
+        """
         recent_filter = gtk.RecentFilter()
         OdmlChooserDialog.setup_file_filter(recent_filter)
 
@@ -454,7 +499,6 @@ class EditorWindow(gtk.Window):
         # recent_filter.filter() method. If the 'filter' return True,
         # the file is included, else not included.
         recent_odml_files = []
-        max_recent_items = 12
 
         all_recent_files = gtk.RecentManager.get_default().get_items()
         filter_info = gtk.RecentFilterInfo()
@@ -470,19 +514,7 @@ class EditorWindow(gtk.Window):
                 recent_odml_files.append(i)
 
         recent_odml_files.sort(key=lambda x: x.get_age())
-        recent_odml_files = recent_odml_files[:max_recent_items]
-
-        if recent_odml_files:
-            text += "\n\nOr open a <b>recently used file</b>:\n"
-            text += "\n".join([u"\u2022 <a href='%s'>%s</a>" %
-                               (i.get_uri(), i.get_display_name())
-                               for i in recent_odml_files])
-
-        page.set_markup(text)
-        page.connect("activate-link", self.welcome_action)
-        page.show()
-        self.notebook.set_show_tabs(False)
-        self.notebook.append_page(page)
+        return recent_odml_files[:max_recent_items]
 
     def welcome_action(self, widget, path):
         """
@@ -554,14 +586,73 @@ class EditorWindow(gtk.Window):
         self.chooser_dialog(title="Open Document", callback=self.load_document)
 
     def load_document(self, uri):
-        """open a new tab, load the document into it"""
-        tab = EditorTab(self)
-        if not tab.load(uri):  # Close tab upon parsing errors
-            tab.close()
-            return
+        """
+        load the document in the background and open a new tab for it,
+        once it is available. The progress is shown above the tabs
+        and loading can be cancelled there.
+        """
+        return self.load_documents([uri])[0]
 
-        self.append_tab(tab)
-        return tab
+    def load_documents(self, uris):
+        """
+        load the documents of all *uris* like load_document(), several
+        documents are loaded in parallel by a pool of worker processes
+        (by worker threads, if no process pool is available, see
+        document_loader.create_process_pool).
+
+        The tabs are opened in the order of *uris*, each one as soon as
+        its document and those of all previous *uris* are available.
+
+        returns the new tabs
+        """
+        executor = None
+        if len(uris) > 1:
+            executor = create_process_pool(len(uris))
+
+        # the tabs in order along with their state: None while loading,
+        # True once loaded and False if loading failed or has been cancelled
+        pending = []
+
+        def attach_finished():
+            while pending and pending[0][1] is not None:
+                tab, success = pending.pop(0)
+                if success:
+                    self.append_tab(tab)
+
+            # none of the documents could be opened and there are
+            # no other tabs left, fall back to the welcome page
+            if not pending and self.notebook.get_n_pages() < 1:
+                self.welcome()
+
+        def load(uri):
+            tab = EditorTab(self)
+            entry = [tab, None]
+            pending.append(entry)
+            bar = LoadingBar(os.path.basename(uri_to_path(uri)))
+            self._loading_box.pack_start(bar, False, False, 1)
+
+            def cancel():
+                bar.close()
+                tab.close()
+                entry[1] = False
+                attach_finished()
+
+            def done(success):
+                bar.close()
+                if not success:  # Close tab upon parsing errors
+                    tab.close()
+                entry[1] = success
+                attach_finished()
+
+            bar.on_cancel = cancel
+            tab.load_async(uri, done, bar.set_progress, executor)
+            return tab
+
+        tabs = [load(uri) for uri in uris]
+        if executor is not None:
+            # the workers exit once all files have been loaded
+            executor.shutdown(wait=False)
+        return tabs
 
     @gui_action("Import", tooltip="Import previous odML version", label="Import odML")
     def import_file(self, action):
@@ -651,8 +742,7 @@ class EditorWindow(gtk.Window):
 
         self.set_status_filename(tab)
         self.update_model(tab)
-        self.enable_undo(tab.command_manager.can_undo)
-        self.enable_redo(tab.command_manager.can_redo)
+        self.enable_editing(not tab.is_saving)
 
         if hasattr(tab, "state"):
             self.set_tab_state(tab.state)
@@ -835,13 +925,63 @@ class EditorWindow(gtk.Window):
 
     def update_model(self, tab):
         """updates the models if a different tab is selected changed"""
+        if self._document is not tab.document:
+            if self._document is not None:
+                self._document.remove_change_handler(self.on_document_changed)
+            if tab.document is not None:
+                tab.document.add_change_handler(self.on_document_changed,
+                                                actions=("reset",))
+            self._document = tab.document
+
+        old_model = self._section_tv.get_model()
+        if old_model is not None:
+            old_model.destroy()
+
         model = None
         if tab.document is not None:
-            model = section_model.SectionModel(tab.document)
+            model = self._section_tv.model_class(tab.document)
 
         self._section_tv.set_model(model)
         self._navigation_bar.document = tab.document
 
+    def on_terminology_ready(self, url):
+        """
+        a terminology has been loaded in the background,
+        highlight the rows of all editor windows again
+        """
+        for win in self.editors:
+            win.refresh_highlighting()
+
+    def refresh_highlighting(self):
+        """
+        render the rows of the section and property view again,
+        e.g. after terminologies have been loaded
+        """
+        for view in (self._section_tv, self._property_tv):
+            model = view.get_model()
+            if hasattr(model, "refresh"):
+                model.refresh()  # store models hold the rendered markup
+            else:
+                view._treeview.queue_draw()
+
+    def on_document_changed(self, context):
+        """
+        rebuild the models of the current tab after its document has been
+        changed in bulk (see treemodel.event.quiet), keeping the expanded
+        and selected rows
+        """
+        tab = self.current_tab
+        if tab is None or tab.document is not context.obj:
+            return
+
+        state = self.get_tab_state()
+        if self._property_tv.model:
+            self._property_tv.model.destroy()
+        self._property_tv.model = None
+
+        self.update_model(tab)
+        self.set_tab_state(state)
+
     @gui_action("SaveAs", tooltip="Save changes to another file", stock_id=gtk.STOCK_SAVE_AS)
     def save_as(self, action):
         """
@@ -959,30 +1099,29 @@ class EditorWindow(gtk.Window):
             wait_dial.change(msg)
             return False
 
+        def refresh_done(wait_dial, failures):
+            wait_dial.destroy()
+            self.terminology_warmup.reset()
+            if self.current_tab is not None:
+                self.terminology_warmup.prefetch_document(self.current_tab.document)
+            self.refresh_highlighting()
+            if failures:
+                err_msg = "\n".join("%s: %s" % (failed, failures[failed])
+                                     for failed in sorted(failures))
+                ErrorDialog(self, "Failed to refresh %d terminology file(s)" %
+                            len(failures), err_msg)
+            return False
+
+        def progress(done, total, _):
+            GLib.idle_add(update_progress_dialog, wait_dial,
+                          "Updated %d of %d Documents..." % (done, total))
+
         def terminologies_refresh(url, wait_dial):
+            failures = {}
             try:
-                cache_load(url, True)
-                term = terminology.Terminologies({})
-                term_doc = terminology.Terminologies._load(term, url)
-                file_num = str(len(term_doc.sections) + 1)
-                GLib.idle_add(update_progress_dialog, wait_dial, "Please wait, while updating " +
-                              file_num + " Documents...")
-
-                # added to ensure message is shown
-                time.sleep(0.2)
-
-                for s_ti, s_term in enumerate(term_doc.sections, 1):
-                    s_term_url = s_term.include
-                    GLib.idle_add(update_progress_dialog, wait_dial,
-                                  "Updating File " + str(s_ti) + " of " + file_num + "...")
-                    # added to ensure message is shown
-                    time.sleep(0.1)
-                    terminology.refresh(s_term_url)
-
-            except RuntimeError:
-                pass
+                failures = refresh_repository(url, progress)
             finally:
-                GLib.idle_add(wait_dial.destroy)
+                GLib.idle_add(refresh_done, wait_dial, failures)
 
         if url:
             wait_dial = WaitDialog(self, "Refreshing Terminology Cache", "")
@@ -1138,6 +1277,20 @@ class EditorWindow(gtk.Window):
     def enable_redo(self, enable=True):
         self.enable_action("Redo", enable)
 
+    def enable_editing(self, enable=True):
+        """
+        enable or disable all editing of the current document,
+        e.g. while it is being saved
+        """
+        for view in (self._section_tv, self._property_tv, self._property_view):
+            view._treeview.set_sensitive(enable)
+
+        cmdm = self.current_tab.command_manager
+        self.enable_undo(enable and cmdm.can_undo)
+        self.enable_redo(enable and cmdm.can_redo)
+        for action in ("Save", "SaveAs"):
+            self.enable_action(action, enable)
+
     @gui_action("Undo", tooltip="Undo last editing action", stock_id=gtk.STOCK_UNDO,
                 label="_Undo", accelerator="<control>Z")
     def undo(self, action):
@@ -1147,23 +1300,18 @@ class EditorWindow(gtk.Window):
             self._info_bar.show_info("Unable to undo last action")
             print("Encountered an exception during undo: %s:%s" % (type(exc), exc))
 
-        # Reset model and view in case a value has been tampered with
-        # to avoid Model and View being out of sync.
-        self._property_tv.reset_value_view(None)
-
     @gui_action("Redo", tooltip="Redo an undone editing action", stock_id=gtk.STOCK_REDO,
                 label="_Redo", accelerator="<control>Y")
     def redo(self, action):
         self.current_tab.command_manager.redo()
 
-        # Reset model and view in case a value has been tampered with
-        # to avoid Model and View being out of sync.
-        self._property_tv.reset_value_view(None)
-
     def command_error(self, error):
         self._info_bar.show_info("Editing failed: %s" % error)
 
     def execute(self, cmd):
+        if self.current_tab.is_saving:
+            self._info_bar.show_info("The document cannot be edited while it is saved.")
+            return
         return self.current_tab.command_manager.execute(cmd)
 
 
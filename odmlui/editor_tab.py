@@ -1,4 +1,5 @@
 import os.path
+import threading
 
 import pygtkcompat
 
@@ -10,11 +11,16 @@ from odml.tools.converters.version_converter import VersionConverter
 
 import gtk
 
+from gi.repository import GLib
+
+from .background_validation import BackgroundValidation
 from .command_manager import CommandManager
+from .document_loader import DocumentLoader, load_document
 from .helpers import uri_to_path, get_parser_for_uri, get_extension, \
-        get_parser_for_file_type, handle_section_import
+        get_parser_for_file_type, save_atomic, unmerged_document
 from .message_dialog import ErrorDialog
 from .treemodel import event
+from .validation_index import ValidationIndex
 from .validation_window import ValidationWindow
 
 pygtkcompat.enable()
@@ -34,8 +40,14 @@ class EditorTab(object):
             cmdm.enable_undo = self.enable_undo
             cmdm.enable_redo = self.enable_redo
             cmdm.error_func = window.command_error
+            cmdm.transaction = lambda: event.transaction(self.document)
         self.command_manager = cmdm
         self.document = None
+        self.background_validation = None
+        self.validation_window = None
+        self._save_thread = None
+        self._save_result = None
+        self.loader = None
         self.window = window
         self._clones = [self]
 
@@ -52,38 +64,81 @@ class EditorTab(object):
 
         self.document = doc
         self.file_uri = None
+        self.window.terminology_warmup.prefetch_document(doc)
+        self.start_background_validation()
 
     def load(self, uri):
+        """
+        load the document at *uri*
+
+        returns True if the document has been loaded
+        """
         self.file_uri = uri
         file_path = uri_to_path(uri)
-        parser = get_parser_for_uri(file_path)
         try:
-            self.document = odml.load(file_path, parser)
-        except InvalidVersionException as inver:
-            _, curr_file = os.path.split(file_path)
-            err_header = "Cannot open file '%s'." % curr_file
-            err_msg = ("You are trying to open an odML file of an outdated format. "
-                       "\n\nUse 'File .. import' to convert and open files of "
-                       "a previous odML format.")
-            ErrorDialog(self.window, err_header, err_msg)
-            self.window.set_welcome()
-            return False
-
+            document = load_document(file_path, get_parser_for_uri(file_path),
+                                     cache=self.window.document_cache)
         except Exception as exc:
-            ErrorDialog(self.window, "Error parsing '%s'" % file_path, str(exc))
-            self.window.set_welcome()
+            self.on_load_error(file_path, exc)
             return False
 
-        self.document.finalize()
+        self.set_loaded_document(document)
+        return True
+
+    def load_async(self, uri, callback, progress=None, executor=None):
+        """
+        Load the document at *uri* in a background thread or, if
+        given, in a worker of the process pool *executor*.
+
+        :param callback: called with True once the document has been
+                         loaded or with False if loading failed.
+        :param progress: called with the fraction done (or None) and a
+                         description of each step of loading.
+        """
+        self.file_uri = uri
+        file_path = uri_to_path(uri)
+
+        def done(document, error):
+            self.loader = None
+            if error is not None:
+                self.on_load_error(file_path, error)
+                callback(False)
+                return
+
+            self.set_loaded_document(document)
+            callback(True)
 
-        # Make sure all Properties within all sections are properly
-        # initialized with the "pseudo_values" attribute.
-        for sec in self.document.sections:
-            handle_section_import(sec)
+        self.loader = DocumentLoader(file_path, get_parser_for_uri(file_path),
+                                     done, progress, executor,
+                                     self.window.document_cache)
+        self.loader.start()
 
+    def cancel_loading(self):
+        """
+        stop a running load_async(), its callback is not called anymore
+        """
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader = None
+
+    def set_loaded_document(self, document):
+        self.document = document
         self.window.registry.add(self.document)
-        self.window._info_bar.show_info("Loading of %s done!" % (os.path.basename(file_path)))
-        return True
+        self.window.terminology_warmup.prefetch_document(document)
+        self.start_background_validation()
+        self.window._info_bar.show_info("Loading of %s done!" % self.get_name())
+
+    def on_load_error(self, file_path, error):
+        if isinstance(error, InvalidVersionException):
+            _, curr_file = os.path.split(file_path)
+            err_header = "Cannot open file '%s'." % curr_file
+            err_msg = ("You are trying to open an odML file of an outdated format. "
+                       "\n\nUse 'File .. import' to convert and open files of "
+                       "a previous odML format.")
+            ErrorDialog(self.window, err_header, err_msg)
+        else:
+            ErrorDialog(self.window, "Error parsing '%s'" % file_path, str(error))
+        self.window.set_welcome()
 
     def convert(self, uri):
         """
@@ -131,6 +186,8 @@ class EditorTab(object):
 
         returns false if the user cancelled the action
         """
+        # a pending save has to be complete before the document is checked
+        self.wait_for_save()
         if not self.is_modified:
             return True
 
@@ -154,23 +211,48 @@ class EditorTab(object):
             return False
         if response == gtk.RESPONSE_NO:
             return True
-        return self.window.save(None)
+        if not self.window.save(None):
+            return False
+
+        # the tab might be closed right away, finish writing the document first
+        self.wait_for_save()
+        return not self.is_modified
+
+    @property
+    def is_saving(self):
+        """
+        True while the document is written by any tab showing it
+        """
+        return any(tab._save_thread is not None for tab in self._clones)
 
     def save(self, uri, file_type=None):
+        """
+        Save the document to *uri*. The document is serialized to a temporary
+        file in a background thread, which replaces the file at *uri* once it
+        is complete. Editing is disabled until then.
+
+        returns True if saving has been started
+        """
+        if self.is_saving:
+            self.window._info_bar.show_info("The document is already being saved.")
+            return False
+
         # Mandatory document validation before save to avoid
         # not being able to open an invalid document.
-        self.remove_validation()
-        validation = odml.validation.Validation(self.document)
-        self.document.validation_result = validation
+        # The background validation result can be used, if it is up to date.
+        validation = None
+        if self.background_validation is not None:
+            validation = self.background_validation.current
+        if validation is None:
+            validation = odml.validation.Validation(self.document)
+        self.replace_validation(validation)
 
         for err in self.document.validation_result.errors:
             if err.is_error:
                 self.window._info_bar.show_info(
                     "Invalid document. Please fix errors (red) before saving.")
                 self.validate()
-                return
-
-        self.document.clean()
+                return False
 
         parser = None
         if file_type:
@@ -185,24 +267,65 @@ class EditorTab(object):
         if ext != parser:
             file_path += ".%s" % parser.lower()
 
+        self._save_result = None
+        self._save_thread = threading.Thread(target=self.write, daemon=True,
+                                             args=(file_path, parser))
+        self.enable_editing(False)
+        self.window._info_bar.show_progress(
+            "Saving %s..." % os.path.basename(file_path))
+        self._save_thread.start()
+        return True
+
+    def write(self, file_path, parser):
+        """
+        write the document to *file_path* in the background thread of save()
+        """
+        error = None
         try:
-            odml.save(self.document, file_path, parser)
+            # Editing is disabled while saving, the document does not
+            # change. Sections merged with a terminology or a linked
+            # section are saved unmerged from a clone.
+            save_atomic(unmerged_document(self.document), file_path, parser)
         except Exception as exc:
-            self.window._info_bar.show_info("Save failed: %s" % exc)
-            return
+            error = exc
+
+        self._save_result = (file_path, error)
+        GLib.idle_add(self.on_save_done)
 
-        # undo the clean
-        self.document.finalize()
+    def wait_for_save(self):
+        """
+        block until a pending save() is complete
+        """
+        for tab in list(self._clones):
+            if tab._save_thread is not None:
+                tab._save_thread.join()
+                tab.on_save_done()
 
-        # Finalize also removes all pseudo_values for any unchanged terminology
-        # entries, rendering these Properties unmodifiable. Re-initialize
-        # the pseudo_values for these Properties.
-        for sec in self.document.sections:
-            handle_section_import(sec)
+    def on_save_done(self):
+        """
+        finish a save() once the document has been written
+        """
+        if self._save_thread is None:
+            return False  # already finished by wait_for_save
+        self._save_thread = None
+
+        file_path, error = self._save_result
+        self._save_result = None
+
+        self.enable_editing(True)
+
+        if error is not None:
+            self.window._info_bar.show_info("Save failed: %s" % error)
+            return False
 
         self.window._info_bar.show_info("%s was saved" % (os.path.basename(file_path)))
         self.edited = len(self.command_manager)
-        return True
+        self.command_manager.checkpoint()
+        return False
+
+    def enable_editing(self, enable=True):
+        if self.window.current_tab in self._clones:
+            self.window.enable_editing(enable)
 
     def enable_undo(self, enable=True):
         for tab in self._clones:
@@ -228,19 +351,83 @@ class EditorTab(object):
         ntab._clones = self._clones
         ntab.file_uri = self.file_uri
         ntab.document = self.document
+        ntab.background_validation = self.background_validation
         return ntab
 
+    def start_background_validation(self):
+        """
+        validate the document in the background after each change
+        """
+        if self.background_validation is not None:
+            self.background_validation.stop()
+        self.background_validation = BackgroundValidation(
+            self.document, self.on_background_validation)
+        self.background_validation.schedule()
+
+    def on_background_validation(self, validation):
+        """
+        attach the result of a background validation to the document
+        and highlight the objects whose messages have changed
+        """
+        self.replace_validation(validation)
+
+        # keep open validation windows of all views of the document up to date
+        for tab in self._clones:
+            if tab.validation_window is not None:
+                tab.validation_window.curr_view.set_errors(validation.errors)
+
     def validate(self):
         """check the document for errors"""
-        self.remove_validation()
-        validation = odml.validation.Validation(self.document)
-        self.document.validation_result = validation
+        validation = None
+        if self.background_validation is not None:
+            validation = self.background_validation.current
+        if validation is not None:
+            self.show_validation(validation)
+            return
+
+        if self.background_validation is None:
+            validation = odml.validation.Validation(self.document)
+            self.replace_validation(validation)
+            self.show_validation(validation)
+            return
+
+        # show the result as soon as the pending run is done
+        self.background_validation.request(self.show_validation)
+        self.window._info_bar.show_info("Validating the document...")
+
+    def show_validation(self, validation):
+        """
+        display the messages of *validation*, which is attached to the document
+        """
         if len(validation.errors) > 0:
-            self.update_validation_error_objects(validation.errors)
-            ValidationWindow(self).show()
+            if self.validation_window is not None:
+                self.validation_window.destroy()
+            self.validation_window = ValidationWindow(self)
+            self.validation_window.show()
         else:
             self.window._info_bar.show_info("The document is valid. No errors found.")
-            self.remove_validation()
+
+    def set_validation(self, validation):
+        """
+        attach the odml.validation.Validation *validation* to the document
+        along with an index of its messages by object
+        """
+        self.document.validation_result = validation
+        self.document.validation_index = ValidationIndex(validation)
+
+    def replace_validation(self, validation):
+        """
+        attach *validation* in place of the current validation of the
+        document and refresh only the objects whose messages have changed
+        """
+        index = getattr(self.document, "validation_index", None)
+        self.set_validation(validation)
+        if index is None:
+            self.update_validation_error_objects(validation.errors)
+            return
+
+        for obj in index.changed(self.document.validation_index):
+            self.update_validation_error_object(obj)
 
     def update_validation_error_objects(self, errors):
         """
@@ -248,10 +435,14 @@ class EditorTab(object):
         so that the gui can refresh these
         """
         for err in errors:
-            change_event = event.ChangeContext(('_error', True))
-            change_event.post_change = True
-            change_event.action = "set"
-            change_event.pass_on(err.obj)
+            self.update_validation_error_object(err.obj)
+
+    @staticmethod
+    def update_validation_error_object(obj):
+        change_event = event.ChangeContext(('_error', True))
+        change_event.post_change = True
+        change_event.action = "set"
+        change_event.pass_on(obj)
 
     def remove_validation(self):
         """remove any dangling validation references"""
@@ -259,6 +450,7 @@ class EditorTab(object):
             return
         errors = self.document.validation_result.errors
         del self.document.validation_result
+        del self.document.validation_index
         self.update_validation_error_objects(errors)
 
     def get_name(self):
@@ -273,4 +465,8 @@ class EditorTab(object):
         """
         any cleanup?
         """
+        self.cancel_loading()
+        self.wait_for_save()
         self._clones.remove(self)
+        if not self._clones and self.background_validation is not None:
+            self.background_validation.stop()
@@ -5,14 +5,16 @@ The 'helpers' module provides various helper functions.
 import getpass
 import json
 import os
+import shutil
 import subprocess
 import sys
+import tempfile
 
 from odml import fileio
 from odml.dtypes import default_values
 from odml.tools.parser_utils import SUPPORTED_PARSERS
 
-from .treemodel import value_model
+from .treemodel import event, value_model
 
 try:  # Python 3
     from urllib.parse import urlparse, unquote, urljoin
@@ -117,19 +119,80 @@ def handle_property_import(prop):
     create_pseudo_values([prop])
 
 
+def current_umask():
+    """
+    *current_umask* returns the file mode creation mask of the process.
+
+    On Linux the mask is read from /proc, since setting it to read
+    it back would affect files created meanwhile by other threads.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (IOError, OSError, ValueError):
+        pass
+
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+def save_atomic(document, file_path, parser):
+    """
+    Save an odml document to a temporary file next to *file_path*,
+    which replaces *file_path* once it has been written completely.
+    An existing file is therefore never left partially written.
+
+    :param document: odml.Document
+    :param file_path: path of the saved file
+    :param parser: odml parser type e.g. 'XML'
+    """
+    dir_name, file_name = os.path.split(os.path.abspath(file_path))
+    handle, tmp_path = tempfile.mkstemp(prefix=".%s." % file_name,
+                                        suffix=".tmp", dir=dir_name)
+    os.close(handle)
+
+    try:
+        fileio.save(document, tmp_path, parser)
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, tmp_path)
+        else:
+            # mkstemp creates the file readable by the owner only
+            os.chmod(tmp_path, 0o666 & ~current_umask())
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def unmerged_document(document):
+    """
+    :param document: odml.Document
+    :return: *document* or, if any of its sections is merged with a
+             terminology or a linked section, a cleaned clone to be saved
+             in its place. The document itself keeps its merged content.
+    """
+    if not any(sec.is_merged for sec in document.itersections(recursive=True)):
+        return document
+
+    # The clone is not shown by any view, there is no need for change events.
+    with event.quiet():
+        clone = document.clone(keep_id=True)
+        clone.clean()
+    return clone
+
+
 def create_pseudo_values(odml_properties):
     """
-    Creates a treemodel.Value for each value in an
-    odML Property and appends the resulting list
-    as *pseudo_values* to the passed odML Property.
+    Attaches a list of treemodel.Values mapping the values
+    of an odML Property as *pseudo_values* to the passed
+    odML Properties. The Values are only created on access.
     """
     for prop in odml_properties:
-        values = prop.values
-        new_values = []
-        for index in range(len(values)):
-            val = value_model.Value(prop, index)
-            new_values.append(val)
-        prop.pseudo_values = new_values
+        prop.pseudo_values = value_model.PseudoValues(prop)
 
 
 def get_conda_root():
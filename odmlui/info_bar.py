@@ -22,6 +22,8 @@ class EditorInfoBar(gtk.InfoBar):
         gtk.InfoBar.__init__(self, *args, **kargs)
         self._msg_label = gtk.Label(label="")
         self._msg_label.show()
+        self._spinner = gtk.Spinner()
+        self.get_content_area().pack_start(self._spinner, False, False, 0)
         self.get_content_area().pack_start(self._msg_label, True, True, 0)
         self.add_button(gtk.STOCK_OK, gtk.RESPONSE_OK)
 
@@ -30,9 +32,7 @@ class EditorInfoBar(gtk.InfoBar):
 
     def _on_response(self, widget, response_id):
         if self == widget and response_id == gtk.RESPONSE_OK:
-            if self._timerid > 0:
-                glib.source_remove(self._timerid)
-                self._timerid = 0
+            self._remove_timer()
             self.hide()
 
     def show_info(self, text):
@@ -45,15 +45,41 @@ class EditorInfoBar(gtk.InfoBar):
 
         :param text: Message to be displayed in the InfoBar.
         """
+        self._stop_spinner()
         self._msg_label.set_text(text)
         self.set_message_type(gtk.MESSAGE_INFO)
         self.show()
         time_delay = max(int(3.0 * len(text) / 60), self.default_timeout)
         self._add_timer(time_delay)
 
+    def show_progress(self, text):
+        """
+        Display a provided text message along with a spinner
+        for a running operation e.g. saving a document. The InfoBar
+        is shown until the next message replaces it.
+
+        :param text: Message to be displayed in the InfoBar.
+        """
+        self._remove_timer()
+        self._msg_label.set_text(text)
+        self.set_message_type(gtk.MESSAGE_INFO)
+        self._spinner.show()
+        self._spinner.start()
+        self.show()
+
+    def _stop_spinner(self):
+        self._spinner.stop()
+        self._spinner.hide()
+
     def _add_timer(self, seconds=default_timeout):
+        self._remove_timer()
         self._timerid = glib.timeout_add_seconds(seconds, self._on_timer)
 
+    def _remove_timer(self):
+        if self._timerid > 0:
+            glib.source_remove(self._timerid)
+            self._timerid = 0
+
     def _on_timer(self):
         self.hide()
         self._timerid = 0
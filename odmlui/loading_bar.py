@@ -0,0 +1,78 @@
+"""
+The 'loading_bar' module provides a class showing the progress
+of a document loaded in the background.
+"""
+
+import pygtkcompat
+import glib
+import gtk
+
+pygtkcompat.enable()
+pygtkcompat.enable_gtk(version='3.0')
+
+
+class LoadingBar(gtk.HBox):
+    """
+    LoadingBar shows the progress of loading the file *name*
+    along with a button to cancel it.
+    """
+    pulse_interval = 100
+
+    def __init__(self, name):
+        gtk.HBox.__init__(self, homogeneous=False, spacing=5)
+        label = gtk.Label(label="Loading %s" % name)
+        self.pack_start(label, False, False, 5)
+
+        self._progress = gtk.ProgressBar()
+        self._progress.set_show_text(True)
+        self.pack_start(self._progress, True, True, 0)
+
+        button = gtk.Button(stock=gtk.STOCK_CANCEL)
+        button.connect("clicked", self._on_cancel_click)
+        self.pack_start(button, False, False, 0)
+
+        self._timerid = 0
+        self.show_all()
+
+    def _on_cancel_click(self, button):
+        self.on_cancel()
+
+    def set_progress(self, fraction, text):
+        """
+        Display the progress of the current step *text*.
+
+        :param fraction: the fraction done or None, if it is unknown.
+                         In this case the bar pulses until the next update.
+        """
+        self._progress.set_text(text)
+        if fraction is None:
+            if not self._timerid:
+                self._timerid = glib.timeout_add(self.pulse_interval, self._on_timer)
+            return
+
+        self._remove_timer()
+        self._progress.set_fraction(fraction)
+
+    def _on_timer(self):
+        self._progress.pulse()
+        return True
+
+    def _remove_timer(self):
+        if self._timerid > 0:
+            glib.source_remove(self._timerid)
+            self._timerid = 0
+
+    def close(self):
+        """
+        stop pulsing and remove the bar
+        """
+        self._remove_timer()
+        self.destroy()
+
+    def on_cancel(self):
+        """
+        called when the cancel button has been clicked
+
+        The actual method is set on the class at the point of usage.
+        """
+        pass
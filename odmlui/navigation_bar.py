@@ -51,7 +51,8 @@ class NavigationBar(gtk.Label):
 
         self._document = doc
         self.set_model(doc)
-        doc.add_change_handler(self.on_section_changed)
+        doc.add_change_handler(self.on_section_changed,
+                               actions=("set", "remove", "append", "insert"))
 
     @property
     def current_object(self):
@@ -33,9 +33,13 @@ class PropertyView(TerminologyPopupTreeView):
     The main TreeView for editing Properties and their value-attributes
     """
     _section = None
+    # the tree model class used to display the properties of a section
+    model_class = property_model.PropertyModel
 
-    def __init__(self, registry):
+    def __init__(self, registry, model_class=None):
         super(PropertyView, self).__init__()
+        if model_class is not None:
+            self.model_class = model_class
         curr_view = self._treeview
 
         for name, (col_id, prop_name) in property_model.COL_MAPPER.sort_iteritems():
@@ -113,7 +117,7 @@ class PropertyView(TerminologyPopupTreeView):
         if self.model:
             self.model.destroy()
 
-        self.model = property_model.PropertyModel(section)
+        self.model = self.model_class(section)
 
     @property
     def model(self):
@@ -164,8 +168,8 @@ class PropertyView(TerminologyPopupTreeView):
         """
         obj = model.get_object(tree_iter)
         doc = obj.document
-        if doc and hasattr(doc, "validation_result"):
-            errors = doc.validation_result[obj]
+        if doc and hasattr(doc, "validation_index"):
+            errors = doc.validation_index[obj]
             if errors:
                 tooltip.set_text("\n".join([e.msg for e in errors]))
                 return True
@@ -231,8 +235,7 @@ class PropertyView(TerminologyPopupTreeView):
                 # empty PseudoValue and add it properly to enable undo.
                 if not prop.pseudo_values:
                     val = value_model.Value(prop)
-                    cmd = commands.AppendValue(obj=prop.pseudo_values, attr=column_name,
-                                               val=val)
+                    cmd = commands.AppendValue(obj=prop, val=val)
                     self.execute(cmd)
 
                 prop = prop.pseudo_values[0]
@@ -245,10 +248,6 @@ class PropertyView(TerminologyPopupTreeView):
         if cmd:
             self.execute(cmd)
 
-        # Always reset the view when changes have occurred
-        # to ensure no GTK view out of sync horror happening.
-        self.reset_value_view(None)
-
     @staticmethod
     def _value_filter(prop):
         values = []
@@ -336,9 +335,6 @@ class PropertyView(TerminologyPopupTreeView):
         cmd = commands.ReplaceObject(obj=prop, repl=dst)
         self.execute(cmd)
 
-        # Reset the view to make sure the changes are properly displayed.
-        self.reset_value_view(None)
-
     def set_value(self, _, prop_value_pair):
         """
         Set the content of a Value. In context this means,
@@ -355,26 +351,12 @@ class PropertyView(TerminologyPopupTreeView):
         if not isinstance(obj, value_model.Value):
             raise TypeError("Expected %s" % type(value_model.Value))
 
-        if not prop == obj.parent:
+        if prop is not obj.parent:
             raise ValueError("Property '%s' is not the parent of '%s'" % (prop, obj))
 
-        # To enable undo redo for this we need a bit of trickery
-        new_prop = prop.clone(keep_id=True)
-        create_pseudo_values([new_prop])
-        if new_prop.pseudo_values[obj.index].pseudo_values != obj.pseudo_values:
-            raise ValueError("Cannot find replacement value")
-
-        # Update the value in the new property
-        new_prop.pseudo_values[obj.index].pseudo_values = val
-
-        # Lets replace the old property with the new and updated one
-        cmd = commands.ReplaceObject(obj=prop, repl=new_prop)
+        cmd = commands.SetPropertyValue(prop=prop, index=obj.index, new_value=val)
         self.execute(cmd)
 
-        # Reset the view to make sure the changes are properly displayed.
-        self.select_object(new_prop)
-        self.reset_value_view(None)
-
     def add_value(self, _, obj_value_pair):
         """
         Add a value to a selected Property
@@ -385,16 +367,13 @@ class PropertyView(TerminologyPopupTreeView):
         (obj, val) = obj_value_pair
         new_val = value_model.Value(obj)
 
-        # Add new empty PseudoValue to the Properties PseudoValue list
-        cmd = commands.AppendValue(obj=obj.pseudo_values, val=new_val)
-        self.execute(cmd)
-
-        # Update the empty new PseudoValue with the actual value.
+        # Set the actual value, before the new PseudoValue is
+        # added to the Property.
         if val:
             new_val.pseudo_values = val
 
-        # Reset the view to make sure the changes are properly displayed.
-        self.reset_value_view(None)
+        cmd = commands.AppendValue(obj=obj, val=new_val)
+        self.execute(cmd)
 
     def add_property(self, _, obj_prop_pair):
         """
@@ -420,26 +399,6 @@ class PropertyView(TerminologyPopupTreeView):
         cmd = commands.AppendValue(obj=obj, val=prop)
         self.execute(cmd)
 
-    def reset_value_view(self, _):
-        """
-        Reset the view if the value model has changed e.g. after an undo or a redo.
-        """
-        obj = self.get_selected_object()
-        if obj is None or not hasattr(obj, "parent") or not obj.parent:
-            return
-
-        prop = obj
-        sec = obj.parent
-        if isinstance(obj, value_model.Value):
-            sec = obj.parent.parent
-            prop = obj.parent
-
-        self.model.destroy()
-        self.model = property_model.PropertyModel(sec)
-
-        # Always select the Property when resetting the view
-        self.select_object(prop)
-
     def create_odml_types_col(self, col_id, name, prop_name):
         """
         Create and return an odML 'dtype' specific gtk.TreeViewColumn
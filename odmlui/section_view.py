@@ -4,13 +4,14 @@ import odml
 
 from odml.section import BaseSection
 
-from . import commands
+from . import commands, terminology_index
 from .drag_provider import DragProvider
 from .dnd.odmldrop import OdmlDrag, OdmlDrop
 from .dnd.targets import PropertyDrop, SectionDrop
 from .dnd.text import TextDrag, TextDrop, TextGenericDropForSectionTV
 from .helpers import handle_section_import
 from .tree_view import TerminologyPopupTreeView
+from .treemodel.section_model import SectionModel
 
 pygtkcompat.enable()
 pygtkcompat.enable_gtk(version='3.0')
@@ -23,8 +24,13 @@ class SectionView(TerminologyPopupTreeView):
     showing properties and allows to edit them
     based on the format-description of the obj's class
     """
-    def __init__(self, registry):
+    # the tree model class used to display the sections of a document
+    model_class = SectionModel
+
+    def __init__(self, registry, model_class=None):
         super(SectionView, self).__init__()
+        if model_class is not None:
+            self.model_class = model_class
         self.add_column(name="Name", edit_func=self.on_edited)
         self._treeview.show()
 
@@ -153,7 +159,7 @@ class SectionView(TerminologyPopupTreeView):
         """
         obj = model.get_object(tree_iter)
 
-        merged = obj.get_merged_equivalent()
+        merged = terminology_index.merged_equivalent(obj)
         info = []
         if merged is not None:
             # the object is only merged
@@ -162,7 +168,7 @@ class SectionView(TerminologyPopupTreeView):
                 # the object is merged but differs from its merged equivalent
                 info[-1] += ' (modified)'
 
-        merged = obj.get_terminology_equivalent()
+        merged = terminology_index.terminology_equivalent(obj)
         if merged is not None:
             # the object has an associated terminology equivalent
             info.append('terminology: %s:%s' % (obj.get_repository(), merged.get_path()))
@@ -173,8 +179,8 @@ class SectionView(TerminologyPopupTreeView):
 
         doc = obj.document
         error = ""
-        if doc and hasattr(doc, "validation_result"):
-            errors = doc.validation_result[obj]
+        if doc and hasattr(doc, "validation_index"):
+            errors = doc.validation_index[obj]
             if errors:
                 error = "\n\nErrors:\n" + "\n".join([e.msg for e in errors])
 
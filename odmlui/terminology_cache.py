@@ -0,0 +1,249 @@
+"""
+The 'terminology_cache' module keeps the terminologies cached
+by odml.terminology up to date and loads them ahead of their use.
+
+The files of a repository are refreshed concurrently
+by a bounded pool of worker threads. The 'TerminologyWarmup'
+loads the terminologies of documents before they are displayed.
+"""
+
+import queue
+import re
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+from gi.repository import GLib
+
+import odml.terminology as terminology
+
+from . import terminology_index
+
+# the number of terminology files downloaded at the same time
+MAX_WORKERS = 8
+
+
+def repository_includes(file_obj):
+    """
+    :param file_obj: file object of a repository file listing
+                     terminologies by their include urls.
+    :return: list of the terminology urls included by the repository
+    """
+    includes = []
+    for elem in ElementTree.parse(file_obj).getroot().iter("include"):
+        url = (elem.text or "").strip().split("#", 1)[0]
+        if url and url not in includes:
+            includes.append(url)
+    return includes
+
+
+def refresh_include(url):
+    """
+    Download the terminology *url* again and replace the document
+    cached for it.
+
+    :return: the refreshed terminology document
+    """
+    file_obj = terminology.cache_load(url, True)
+    if file_obj is None:
+        raise IOError("Download failed")
+    file_obj.close()
+
+    # the file has just been downloaded, parse it from the cache
+    doc = terminology.terminologies._load(url)
+    if doc is None:
+        raise ValueError("Parsing failed")
+    return doc
+
+
+def refresh_repository(url, progress=None, max_workers=MAX_WORKERS):
+    """
+    Refresh the repository file *url* and all terminologies it includes.
+    The includes are refreshed concurrently by up to *max_workers* threads.
+
+    :param progress: called in the worker threads with the number of files
+                     done, the total number of files and the url of the file
+                     done last. The calls are serialized, the number of
+                     files done increases with each call.
+    :return: dict mapping the urls that could not be refreshed to their error
+    """
+    try:
+        file_obj = terminology.cache_load(url, True)
+        if file_obj is None:
+            raise IOError("Download failed")
+        with file_obj:
+            includes = repository_includes(file_obj)
+    except Exception as exc:
+        return {url: exc}
+
+    # The repository is parsed again once it is used next,
+    # resolving its includes from the refreshed cache.
+    terminology.terminologies.pop(url, None)
+
+    total = len(includes) + 1
+    failures = {}
+    done = [1]
+    lock = threading.Lock()
+
+    def on_done(include, future):
+        with lock:
+            done[0] += 1
+            if future.exception() is not None:
+                failures[include] = future.exception()
+            if progress is not None:
+                progress(done[0], total, include)
+
+    if progress is not None:
+        progress(1, total, url)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for include in includes:
+            future = executor.submit(refresh_include, include)
+            future.add_done_callback(
+                lambda future, include=include: on_done(include, future))
+
+    terminology_index.invalidate()
+    return failures
+
+
+# the document repository in the odml xml, yaml and json formats
+REPOSITORY_PATTERNS = [re.compile(r"<repository>\s*([^<\s]+)\s*</repository>"),
+                       re.compile(r"^\s*repository:\s*[\"']?([^\"'\s]+)", re.MULTILINE),
+                       re.compile(r'"repository"\s*:\s*"([^"]+)"')]
+
+
+def read_repository(file_path, size=64 * 1024):
+    """
+    Find the repository of the odml file *file_path* without parsing it.
+    The document attributes precede its sections, only the first *size*
+    bytes are searched.
+
+    :return: the repository url or None
+    """
+    try:
+        with open(file_path, "rb") as src:
+            head = src.read(size).decode("utf-8", "replace")
+    except (IOError, OSError):
+        return None
+
+    for pattern in REPOSITORY_PATTERNS:
+        match = pattern.search(head)
+        if match:
+            return match.group(1)
+    return None
+
+
+def document_repositories(document):
+    """
+    :return: list of the repository urls used by *document* and its sections
+    """
+    urls = []
+    for obj in [document] + list(document.itersections(recursive=True)):
+        url = obj.repository
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def warm_up(url):
+    """
+    load the terminology *url* and build its index
+
+    :return: True if the terminology is available
+    """
+    try:
+        return terminology_index.get_index(url, wait=True) is not None
+    finally:
+        terminology_index.loading.discard(url)
+
+
+class TerminologyWarmup(object):
+    """
+    TerminologyWarmup loads and indexes terminologies in a bounded pool
+    of worker threads ahead of their first use, so displaying a document
+    does not stall while its repository is resolved.
+
+    *callback* is called in the GTK main loop with the url of each
+    terminology, once it is ready.
+
+    The workers are daemon threads, a pending download never
+    delays quitting the application.
+    """
+
+    def __init__(self, callback, max_workers=MAX_WORKERS):
+        self.callback = callback
+        self.max_workers = max_workers
+        self._queue = queue.Queue()
+        self._workers = []
+        self._requested = set()
+
+    def submit(self, func, *args):
+        """
+        run *func* with *args* in one of the worker threads
+        """
+        self._queue.put((func, args))
+        if len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self.work, daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def work(self):
+        while True:
+            func, args = self._queue.get()
+            try:
+                func(*args)
+            except Exception as exc:
+                print("[Warning] Terminology warm-up failed: %s" % exc)
+
+    def prefetch(self, url):
+        """
+        load the terminology *url*, unless it has been requested before
+        """
+        if not url or url in self._requested:
+            return False
+        self._requested.add(url)
+        # the views do not wait for the terminology, they are
+        # refreshed once it is ready
+        terminology_index.loading.add(url)
+        self.submit(self.load, url)
+        return False
+
+    def prefetch_document(self, document):
+        """
+        load the terminologies of all repositories of *document*
+        """
+        for url in document_repositories(document):
+            self.prefetch(url)
+
+    def prefetch_files(self, file_paths):
+        """
+        load the terminologies of the odml files *file_paths*, their
+        repositories are read in the worker threads as well
+        """
+        for file_path in file_paths:
+            self.submit(self.read, file_path)
+
+    def read(self, file_path):
+        url = read_repository(file_path)
+        if url:
+            # the requested urls are only accessed in the main loop
+            GLib.idle_add(self.prefetch, url)
+
+    def load(self, url):
+        if warm_up(url):
+            GLib.idle_add(self.deliver, url)
+
+    def deliver(self, url):
+        """
+        pass on a terminology to the callback in the main loop once it is ready
+        """
+        self.callback(url)
+        return False
+
+    def reset(self):
+        """
+        forget the requested terminologies, e.g. after they have
+        been refreshed, so they are loaded again on request
+        """
+        self._requested.clear()
@@ -0,0 +1,201 @@
+"""
+The 'terminology_index' module provides cheap lookups of the
+terminology equivalents of odml objects.
+
+odml resolves the repository and walks the terminology tree on each call
+of get_terminology_equivalent(). The views look up the equivalent of each
+row they render, so the sections and properties of each terminology are
+indexed once instead. An index is rebuilt once its terminology has been
+reloaded or the terminologies have been refreshed (see invalidate).
+"""
+
+from odml.doc import BaseDocument
+from odml.property import BaseProperty
+from odml.section import BaseSection
+import odml.terminology as terminology
+
+
+class TerminologyIndex(object):
+    """
+    TerminologyIndex maps the paths of all sections and properties of the
+    terminology document *term* to the objects and the section types to
+    the sections of the type.
+    """
+
+    def __init__(self, term):
+        self.term = term
+        self.paths = {}
+        self.types = {}
+        self.first = None
+        # the properties of each indexed section by name, keyed by
+        # section id as sibling sections may share the same path
+        self._properties = {}
+
+        # sections are added depth first, the order find_related() uses
+        self.add_sections(term)
+
+    def add_sections(self, parent):
+        for sec in parent.sections:
+            self.add_section(sec)
+            self.add_sections(sec)
+
+    def add_section(self, sec):
+        if self.first is None:
+            self.first = sec
+
+        path = sec.get_path()
+        self.paths.setdefault(path, sec)
+        self.types.setdefault((sec.type or "").lower(), []).append(sec)
+
+        props = self._properties[id(sec)] = {}
+        for prop in sec.properties:
+            props[prop.name] = prop
+            self.paths.setdefault("%s:%s" % (path, prop.name), prop)
+
+    def __getitem__(self, path):
+        return self.paths[path]
+
+    def candidates(self, sec_type):
+        """
+        :return: list of the sections of type *sec_type*
+        """
+        return self.types.get((sec_type or "").lower(), [])
+
+    def find_type(self, sec_type):
+        """
+        :return: the first section of *sec_type* or, if no type is
+                 given, the first section as found by
+                 BaseSection.find_related(type=sec_type)
+        """
+        if not sec_type:
+            return self.first
+
+        candidates = self.candidates(sec_type)
+        if candidates:
+            return candidates[0]
+        return None
+
+    def property(self, sec, name):
+        """
+        :return: the property *name* of the indexed section *sec* or None
+        """
+        return self._properties.get(id(sec), {}).get(name)
+
+
+_indices = {}
+
+# incremented whenever terminologies are reloaded, views
+# compare it to find out when to highlight their rows again
+generation = 0
+
+# the urls of the terminologies loaded in the background
+# (see terminology_cache.TerminologyWarmup)
+loading = set()
+
+# the urls of the terminologies that could not be loaded, they are
+# not requested again on each lookup until they are invalidated
+_failed = set()
+
+
+def get_index(url, wait=False):
+    """
+    :param wait: wait for a terminology that is still loaded in the
+                 background instead of returning None.
+    :return: the TerminologyIndex of the terminology *url* or None, if it
+             cannot be loaded. The terminology is loaded if required,
+             a failure is remembered until the url is invalidated.
+    """
+    global generation
+
+    if url is None:
+        return None
+
+    index = _indices.get(url)
+    if index is not None and index.term is terminology.terminologies.get(url):
+        return index
+
+    if url in _failed and terminology.terminologies.get(url) is None:
+        return None
+
+    if url in loading and url not in terminology.terminologies and not wait:
+        return None
+
+    term = terminology.load(url)
+    if term is None:
+        _failed.add(url)
+        return None
+    _failed.discard(url)
+
+    index = _indices[url] = TerminologyIndex(term)
+    generation += 1
+    return index
+
+
+def index_of(term):
+    """
+    :return: the TerminologyIndex of the loaded terminology document
+             *term* or None, if *term* is no terminology
+    """
+    for url, loaded in list(terminology.terminologies.items()):
+        if loaded is term:
+            return get_index(url)
+    return None
+
+
+def invalidate(url=None):
+    """
+    drop the index of *url* or, if no url is given, all indices
+    """
+    global generation
+
+    if url is None:
+        _indices.clear()
+        _failed.clear()
+    else:
+        _indices.pop(url, None)
+        _failed.discard(url)
+    generation += 1
+
+
+def terminology_equivalent(obj):
+    """
+    :return: the same as obj.get_terminology_equivalent(),
+             looked up in the TerminologyIndex of its repository
+    """
+    if isinstance(obj, BaseSection):
+        index = get_index(obj.get_repository())
+        if index is None:
+            return None
+        return index.find_type(obj.type)
+
+    if isinstance(obj, BaseProperty):
+        if obj.parent is None:
+            return None
+        index = get_index(obj.parent.get_repository())
+        if index is None:
+            return None
+        return index.property(index.find_type(obj.parent.type), obj.name)
+
+    if isinstance(obj, BaseDocument):
+        index = get_index(obj.repository)
+        return None if index is None else index.term
+
+    return obj.get_terminology_equivalent()
+
+
+def merged_equivalent(obj):
+    """
+    :return: the same as obj.get_merged_equivalent(), properties of
+             sections merged with a terminology are looked up in its index
+    """
+    if not isinstance(obj, BaseProperty):
+        return obj.get_merged_equivalent()
+
+    if obj.parent is None or not obj.parent.is_merged:
+        return None
+
+    merged = obj.parent.get_merged_equivalent()
+    index = index_of(merged.document)
+    if index is None:
+        return merged.contains(obj)
+    return index.property(merged, obj.name)
@@ -3,7 +3,7 @@ import pygtkcompat
 
 import gtk
 
-from . import commands
+from . import commands, terminology_index
 
 pygtkcompat.enable()
 pygtkcompat.enable_gtk(version='3.0')
@@ -171,7 +171,7 @@ class TerminologyPopupTreeView(TreeView):
         """
         if obj is None:
             return []
-        term = obj.get_terminology_equivalent()
+        term = terminology_index.terminology_equivalent(obj)
         if term is None:
             return []
         return func(term)
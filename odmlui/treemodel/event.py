@@ -1,5 +1,11 @@
 import sys
+import threading
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
 import odml
+import odml.dtypes as dtypes
 
 
 class Event(object):
@@ -21,7 +27,8 @@ class Event(object):
         return self
 
     def fire(self, *args, **kargs):
-        for handler in self.handlers:
+        # handlers may (un)register handlers, e.g. when rebuilding a view
+        for handler in list(self.handlers):
             handler(*args, **kargs)
         self.finish(*args, **kargs)
 
@@ -65,6 +72,8 @@ class ChangeContext(object):
     * "set": val = (attribute_name, new_value)
     * "insert", "append": val = object to be inserted
     * "remove": val = object to be remove
+    * "reset": val = None, the document has been changed in bulk
+      (see quiet) and views need to be rebuilt
 
     Events may be passed on in the hierarchy, thus the context also
     holds state for this. *cur* holds the current node receiving the
@@ -148,6 +157,14 @@ class ChangeContext(object):
         return repr(self) + "\nObject stack:\n\t" + "\n\t".join(map(repr, self._obj))
 
 
+# fired right after a structural change (see STRUCTURAL_ACTIONS) has been
+# applied to a node, before any post_change event is passed on. Used to
+# keep caches derived from the tree layout (e.g. child positions) in sync.
+# Handlers are called as handler(node, action, obj).
+STRUCTURAL_ACTIONS = ("append", "insert", "remove", "reorder")
+structure_changed = Event("structure")
+
+
 class ChangedEvent(object):
     def __init__(self):
         pass
@@ -161,23 +178,233 @@ class EventHandler(object):
         return self._func(*args, **kargs)
 
 
+class QuietScope(object):
+    """
+    An active quiet() block, suppressing the change events of all objects
+    of *document* (or of all objects if *document* is None) and counting
+    the suppressed events.
+    """
+    def __init__(self, document=None):
+        self.document = document
+        self.suppressed = 0
+
+
+class _QuietScopes(threading.local):
+    """
+    the stack of quiet scopes active in the current thread
+    """
+    def __init__(self):
+        self.scopes = []
+
+
+_quiet = _QuietScopes()
+
+
+def quiet_scope(obj):
+    """
+    returns the innermost active QuietScope covering *obj* or None
+    """
+    if not _quiet.scopes:
+        return None
+
+    document = False  # not looked up yet
+    for scope in reversed(_quiet.scopes):
+        if scope.document is None:
+            return scope
+        if document is False:
+            document = getattr(obj, "document", None)
+        if document is scope.document:
+            return scope
+    return None
+
+
+def suppressed(obj):
+    """
+    returns True, if the change events of *obj* are suppressed
+    by a quiet scope and counts the suppressed event
+    """
+    scope = quiet_scope(obj)
+    if scope is None:
+        return False
+    scope.suppressed += 1
+    return True
+
+
+@contextmanager
+def quiet(document=None):
+    """
+    Context manager suspending all change events of the objects of *document*
+    or, if no document is given, of all objects modified in the current thread.
+    Use it for bulk operations (loading, cleaning, importing) that no view
+    needs to follow row by row.
+
+    Structural changes are still announced via structure_changed, so
+    node paths stay valid. If any event was suppressed, a single "reset"
+    post_change event is passed to *document* once the outermost quiet
+    block of the document is left.
+    """
+    scope = QuietScope(document)
+    _quiet.scopes.append(scope)
+    try:
+        yield scope
+    finally:
+        _quiet.scopes.remove(scope)
+        if scope.suppressed:
+            if document is not None:
+                outer = quiet_scope(document)
+            else:
+                outer = next((outer for outer in reversed(_quiet.scopes)
+                              if outer.document is None), None)
+            if outer is not None:
+                outer.suppressed += scope.suppressed
+            elif document is not None:
+                change_context = ChangeContext(None)
+                change_context.action = "reset"
+                change_context.post_change = True
+                change_context.pass_on(document)
+
+
+class TransactionScope(object):
+    """
+    An active transaction() block of *document*, buffering the
+    "set" changes of its objects by object and attribute.
+    """
+    def __init__(self, document):
+        self.document = document
+        self.changes = OrderedDict()
+
+    def add(self, obj, name, value):
+        self.changes[(id(obj), name)] = (obj, name, value)
+
+    def commit(self):
+        """
+        pass a post_change "set" event for each changed attribute of all
+        objects still being part of the document
+        """
+        for obj, name, value in self.changes.values():
+            if getattr(obj, "document", None) is not self.document:
+                continue
+            try:
+                obj.to_path()
+            except ValueError:
+                continue  # no longer part of the document
+
+            change_context = ChangeContext((name, value))
+            change_context.action = "set"
+            change_context.post_change = True
+            change_context.pass_on(obj)
+
+
+class _Transactions(threading.local):
+    """
+    the stack of transactions active in the current thread
+    """
+    def __init__(self):
+        self.scopes = []
+
+
+_transactions = _Transactions()
+
+
+def transaction_scope(obj):
+    """
+    returns the innermost active TransactionScope covering *obj* or None
+    """
+    if not _transactions.scopes:
+        return None
+
+    document = getattr(obj, "document", None)
+    for scope in reversed(_transactions.scopes):
+        if document is scope.document:
+            return scope
+    return None
+
+
+@contextmanager
+def transaction(document):
+    """
+    Context manager batching the changes to the attributes of the objects of
+    *document*, e.g. while a command is executed or undone.
+
+    Instead of a pre- and post_change event for every single assignment, a
+    single post_change "set" event per changed object and attribute is
+    passed on, once the outermost transaction of the document is left.
+    Structural changes (append, insert, remove, reorder) are passed on
+    immediately, as views need to follow them step by step.
+    """
+    if document is None:
+        yield None
+        return
+
+    scope = TransactionScope(document)
+    _transactions.scopes.append(scope)
+    try:
+        yield scope
+    finally:
+        _transactions.scopes.remove(scope)
+        outer = transaction_scope(document)
+        if outer is not None:
+            outer.changes.update(scope.changes)
+        else:
+            scope.commit()
+
+
+class ActionHandler(object):
+    """
+    Wraps a change handler *func* to be called only for
+    change contexts of one of the given *actions*.
+
+    Compares equal to *func*, so the handler can be removed
+    using the original function.
+    """
+    def __init__(self, func, actions):
+        self.func = func
+        self.actions = frozenset(actions)
+
+    def __call__(self, context):
+        if context.action in self.actions:
+            self.func(context)
+
+    def __eq__(self, other):
+        if isinstance(other, ActionHandler):
+            other = other.func
+        return self.func == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+
 class ChangeHandlable(object):
     """
     For objects that support the add_change_handler
     and remove_change_handler functions.
+
+    Handlers are registered with the very object (typically a document or
+    section) they are interested in and only receive the change contexts
+    passed on to this object, i.e. the changes of the object itself and
+    of its children.
     """
     _change_handler = None
 
-    def add_change_handler(self, func):
+    def add_change_handler(self, func, actions=None):
+        """
+        register *func* to be called with each change context passed to
+        this object or, if *actions* are given, only with contexts of
+        these actions
+        """
         if self._change_handler is None:
             self._change_handler = Event(self.__class__.__name__)
+        if actions is not None:
+            func = ActionHandler(func, actions)
         self._change_handler += func
 
     def remove_change_handler(self, func):
         if self._change_handler is not None:
             self._change_handler -= func
-        if len(self._change_handler) == 0:
-            del self._change_handler
+            if len(self._change_handler) == 0:
+                del self._change_handler
 
 
 class ModificationNotifier(ChangeHandlable):
@@ -186,11 +413,17 @@ class ModificationNotifier(ChangeHandlable):
     """
     def __setattr__(self, name, value):
         fire = not name.startswith('_') and hasattr(self, name)
-        func = lambda: super(ModificationNotifier, self).__setattr__(name, value)
-        if fire:
+        if fire and not suppressed(self):
+            scope = transaction_scope(self)
+            if scope is not None:
+                super(ModificationNotifier, self).__setattr__(name, value)
+                scope.add(self, name, value)
+                return
+
+            func = lambda: super(ModificationNotifier, self).__setattr__(name, value)
             self.__fire_change("set", (name, value), func)
         else:
-            func()
+            super(ModificationNotifier, self).__setattr__(name, value)
 
     def __fire_change(self, action, obj, func):
         """
@@ -199,12 +432,22 @@ class ModificationNotifier(ChangeHandlable):
         * fire a pre_change-event
         * call func
         * fire a post_change-event
+
+        within a quiet() block, only func is called
         """
+        if action != "set" and suppressed(self):
+            res = func()
+            if action in STRUCTURAL_ACTIONS:
+                structure_changed(self, action, obj)
+            return res
+
         change_context = ChangeContext(obj)
         change_context.action = action
         change_context.pre_change = True
         change_context.pass_on(self)
         res = func()
+        if action in STRUCTURAL_ACTIONS:
+            structure_changed(self, action, obj)
         change_context.reset()
         change_context.post_change = True
         change_context.pass_on(self)
@@ -212,6 +455,12 @@ class ModificationNotifier(ChangeHandlable):
 
     def append(self, obj, *args, **kwargs):
         func = lambda: super(ModificationNotifier, self).append(obj, *args, **kwargs)
+
+        # Dirty Hack - see remove(), append the content of a pseudo value
+        # to the property instead of the pseudo value itself.
+        if hasattr(self, "pseudo_values") and hasattr(obj, "pseudo_values"):
+            func = lambda: insert_value(self, obj)
+
         self.__fire_change("append", obj, func)
 
     def remove(self, obj):
@@ -228,6 +477,11 @@ class ModificationNotifier(ChangeHandlable):
 
     def insert(self, position, obj):
         func = lambda: super(ModificationNotifier, self).insert(position, obj)
+
+        # Dirty Hack - see remove()
+        if hasattr(self, "pseudo_values") and hasattr(obj, "pseudo_values"):
+            func = lambda: insert_value(self, obj, position)
+
         self.__fire_change("insert", obj, func)
 
     def _reorder(self, obj_list, new_index):
@@ -239,43 +493,73 @@ class ModificationNotifier(ChangeHandlable):
             return self.__fire_change("reorder", (self, new_index), func)
 
 
+def set_value(prop, index, new_value):
+    """
+    Convert a single value to the dtype of a property and replace the
+    value at *index* in place. Other than assigning Property.values, this
+    neither copies the value list nor validates all other values again.
+    Change events are fired by the pseudo value calling this.
+    :param prop: odml Property augmented to fit odml-ui.
+    :param index: position of the value to replace.
+    :param new_value: the new value; raises a ValueError if it cannot be
+                      converted to the dtype of prop.
+    """
+    prop._values[index] = dtypes.get(new_value, prop.dtype)
+
+
+def insert_value(prop, pseudo, index=None):
+    """
+    Insert a pseudo value, that is not part of a property, and its
+    content into a property in place and update the index of
+    subsequent pseudo values.
+    :param prop: odml Property augmented to fit odml-ui.
+    :param pseudo: odmlui.treemodel.ValueModel.Value that should be
+                   added to prop.
+    :param index: position of the new value, appends it if None.
+    """
+    if index is None:
+        index = len(prop.pseudo_values)
+    index = max(0, min(index, len(prop.pseudo_values)))
+
+    prop._values.insert(index, dtypes.get(pseudo._content, prop.dtype))
+    prop.pseudo_values.insert(index, pseudo)
+    pseudo._property = prop
+    pseudo._detached = False
+    pseudo._content = None
+
+
 def remove_value(prop, pseudo):
     """
     Remove a pseudo value and its content from a property
     and cleanup the index of subsequent pseudo values to
     make sure the view does not break.
+    The pseudo value keeps its content, so it can be
+    inserted again e.g. on undo.
     :param prop: odml Property augmented to fit odml-ui.
     :param pseudo: odmlui.treemodel.ValueModel.Value that should be
                    removed from prop.
     """
-    # Remove pseudo_value first.
-    del prop.pseudo_values[pseudo._index]
-    # Clean up indices of subsequent pseudovalues.
-    for pval in prop.pseudo_values[pseudo._index:]:
-        pval._index = pval._index - 1
-    # Finally remove the actual value from the property value list.
-    # Property.values always returns a copy so we need to modify and reassign
-    # the affected values.
-    cp_val = prop.values
-    del cp_val[pseudo._index]
-    prop.values = cp_val
+    # Remove pseudo_value first, this also cleans up the
+    # indices of subsequent pseudo values.
+    index = prop.pseudo_values.index(pseudo)
+    del prop.pseudo_values[index]
+    # Finally remove the actual value from the property value list in place.
+    pseudo._content = prop._values.pop(index)
+    pseudo._detached = True
 
 
 def reorder_value(value, prop, new_index):
     """
-    Reorder a property value and its corresponding pseudo_value.
+    Reorder a property value in place. The pseudo values keep their
+    positions and display the reordered values.
     :param prop: odml Property augmented to fit odml-ui.
     :param value: odmlui.treemodel.ValueModel.Value.
     :param new_index: new position of the value.
     """
-
-    v_list = prop.values
     old_index = value._index
-    new_order = list(range(len(v_list)))
-    new_order.insert(new_index, old_index)
-    del new_order[old_index if new_index > old_index else (old_index+1)]
-    new_v_list = [v_list[i] for i in new_order]
-    prop.values = new_v_list
+    v_list = prop._values
+    v_list.insert(new_index if new_index < old_index else (new_index-1),
+                  v_list.pop(old_index))
 
 
 def reorder(obj, obj_list, new_index):
@@ -1,4 +1,5 @@
 import sys
+import weakref
 
 try:  # Python 3
     from html import escape as html_escape
@@ -16,18 +17,25 @@ class GenericIter(object):
     need to have a IterClass attribute. If it is missing a GenericIter
     will be used.
     """
+    __slots__ = ("_obj", "_cache", "__weakref__")
+
     is_python2 = (sys.version_info < (3, 0))
 
-    def __init__(self, obj):
+    def __init__(self, obj, cache=None):
         """
         create a new iterator for a object
+
+        iterators for related objects (parent, children, next) are
+        taken from the IterCache *cache*, if provided
         """
         self._obj = obj
+        self._cache = cache
 
     def new_iter(self, obj):
-        if hasattr(obj, "IterClass"):
-            return obj.IterClass(obj)
-        return self.__class__(obj)
+        iter_class = getattr(obj, "IterClass", self.__class__)
+        if self._cache is not None:
+            return self._cache.get(obj, iter_class)
+        return iter_class(obj)
 
     @staticmethod
     def escape(value):
@@ -53,7 +61,7 @@ class GenericIter(object):
         """
         obj = self._obj.__next__()
         if obj is not None:
-            return obj.IterClass(obj)
+            return self.new_iter(obj)
 
     def get_children(self):
         return self.get_nth_child(0)
@@ -76,14 +84,14 @@ class GenericIter(object):
         if not hasattr(self._obj, "parent"):
             return None
         obj = self._obj.parent
-        return obj.IterClass(obj)
+        return self.new_iter(obj)
 
     def get_nth_child(self, n):
         if not self.has_child:
             return None
 
         obj = self._obj.children[n]
-        return obj.IterClass(obj)
+        return self.new_iter(obj)
 
     def __repr__(self):
         return "<%s %s <= %s[%d]>" % (
@@ -91,3 +99,40 @@ class GenericIter(object):
             repr(self._obj),
             repr(self._obj.parent),
             self._obj.position)
+
+
+class IterCache(object):
+    """
+    A flyweight store providing a single iterator per object and iterator class.
+
+    GTK queries the iterators of a model thousands of times per redraw, this
+    way none of these queries needs to allocate a new iterator and the
+    identity of the iterator of an object stays stable.
+
+    Entries are weak references, an iterator is dropped as soon as nobody
+    (i.e. the gtk model) references it anymore. As each iterator keeps its
+    object alive, the object ids used as keys remain unique.
+    """
+    def __init__(self):
+        self._iters = weakref.WeakValueDictionary()
+
+    def get(self, obj, iter_class=None):
+        """
+        return the iterator of class *iter_class* (defaults to obj.IterClass)
+        for the object *obj*
+        """
+        if iter_class is None:
+            iter_class = getattr(obj, "IterClass", GenericIter)
+
+        key = (id(obj), iter_class)
+        tree_iter = self._iters.get(key)
+        if tree_iter is None:
+            tree_iter = iter_class(obj, self)
+            self._iters[key] = tree_iter
+        return tree_iter
+
+    def clear(self):
+        self._iters.clear()
+
+    def __len__(self):
+        return len(self._iters)
@@ -4,6 +4,7 @@ Document, Section, Property and Value.
 
 Additionally implements change notifications up to the corresponding section.
 """
+import itertools
 import sys
 
 import odml
@@ -41,6 +42,220 @@ def identity_index(obj, val):
     raise ValueError("%s does not contain the item %s" % (repr(obj), repr(val)))
 
 
+class IdentityIndex(object):
+    """
+    Maps the identity of the items of a child list to their position,
+    providing identity_index lookups in constant time.
+
+    The map is kept up to date by the structural change events of the
+    owning node (see update_child_index). Every lookup is verified against
+    the list though, so changes bypassing the event system (e.g. odml
+    internals working on the raw lists) only cause a rebuild of the map
+    instead of a wrong result.
+    """
+    def __init__(self, items):
+        self.rebuild(items)
+
+    def rebuild(self, items):
+        positions = {}
+        for i, item in enumerate(items):
+            positions.setdefault(id(item), i)
+        self._items = items
+        self._positions = positions
+
+    def index(self, items, item):
+        """
+        same as identity_index(items, item)
+        """
+        pos = self._positions.get(id(item))
+        if items is not self._items or pos is None or \
+                pos >= len(items) or items[pos] is not item:
+            self.rebuild(items)
+            pos = self._positions.get(id(item))
+            if pos is None:
+                raise ValueError("%s does not contain the item %s" %
+                                 (repr(items), repr(item)))
+        return pos
+
+    def appended(self, items):
+        """
+        register the last element of *items*, that has just been appended
+        """
+        if items is self._items and items:
+            self._positions.setdefault(id(items[-1]), len(items) - 1)
+
+    def inserted(self, items, item):
+        """
+        register *item*, that has just been inserted into *items*,
+        and shift the positions of all subsequent elements
+        """
+        if items is not self._items or not items:
+            return
+
+        # all elements in front of the new one kept their positions
+        positions = self._positions
+        low, high = 0, len(items) - 1
+        while low < high:
+            mid = (low + high) // 2
+            if positions.get(id(items[mid])) == mid:
+                low = mid + 1
+            else:
+                high = mid
+
+        if items[low] is item:
+            self._update(items, low, len(items))
+
+    def removed(self, items, item):
+        """
+        drop *item*, that has just been removed from *items*,
+        and shift the positions of all subsequent elements
+        """
+        if items is not self._items:
+            return
+
+        pos = self._positions.pop(id(item), None)
+        if pos is not None:
+            self._update(items, pos, len(items))
+
+    def moved(self, items, item, new_pos):
+        """
+        update the positions of the elements between the old
+        position of *item* and its new position *new_pos*
+        """
+        if items is not self._items:
+            return
+
+        old_pos = self._positions.get(id(item))
+        if old_pos is not None:
+            self._update(items, min(old_pos, new_pos),
+                         min(max(old_pos, new_pos) + 1, len(items)))
+
+    def _update(self, items, start, stop):
+        positions = self._positions
+        for i in range(max(start, 0), stop):
+            positions[id(items[i])] = i
+
+
+def get_child_indices(node, create=False):
+    """
+    return the child indices of *node* or, if it has none yet,
+    a new empty dict if *create* is set, otherwise None
+    """
+    # The indices are kept on the node along with the id of their owner.
+    # The shallow copies done by odml's clone() carry the indices of the
+    # original along, the owner tells them apart.
+    entry = node.__dict__.get("_child_indices")
+    if entry is not None and entry[0] == id(node):
+        return entry[1]
+    if not create:
+        return None
+
+    indices = {}
+    node._child_indices = (id(node), indices)
+    return indices
+
+
+def child_index(node, name, child):
+    """
+    return the position of *child* in the child list *name* of *node*
+    """
+    indices = get_child_indices(node, create=True)
+
+    items = getattr(node, name)
+    index = indices.get(name)
+    if index is None:
+        index = indices[name] = IdentityIndex(items)
+    return index.index(items, child)
+
+
+def update_child_index(node, action, obj):
+    """
+    handler for event.structure_changed keeping the child indices
+    of *node* in sync with its child lists
+    """
+    if action == "reorder":
+        # reorder is issued by the moved child itself
+        obj, new_pos = obj
+        node = node.parent
+
+    indices = get_child_indices(node)
+    if not indices:
+        return
+
+    for name, index in indices.items():
+        items = getattr(node, name)
+        if action == "append":
+            index.appended(items)
+        elif action == "insert":
+            index.inserted(items, obj)
+        elif action == "remove":
+            index.removed(items, obj)
+        else:
+            index.moved(items, obj, new_pos)
+
+
+event.structure_changed += update_child_index
+
+
+# source of the structure stamps, see ParentedNode.to_path
+_structure_generations = itertools.count(1)
+
+
+def child_nodes(node):
+    """
+    return the sections, properties and pseudo values directly below *node*
+    """
+    if isinstance(node, SectionNode):
+        return list(node._sections) + list(node._props)
+    if isinstance(node, PropertyNode):
+        return list(getattr(node, "pseudo_values", ()))
+    if isinstance(node, RootNode) and not isinstance(node, ParentedNode):
+        return list(node._sections)
+    # values
+    return []
+
+
+def stamp_subtree(node, generation):
+    """
+    set the structure stamp of *node* and all nodes below it,
+    which have a memoized path, to *generation*
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        cache = getattr(node, "_path_cache", None)
+        # paths are memoized top down, so there are no
+        # memoized paths below a node without one
+        if cache is None or cache[0] != node._structure_stamp:
+            continue
+        node._structure_stamp = generation
+        stack.extend(child_nodes(node))
+
+
+def update_structure_stamps(node, action, obj):
+    """
+    handler for event.structure_changed bumping the structure
+    stamps of the subtrees, whose paths have changed
+    """
+    generation = next(_structure_generations)
+    if action == "append":
+        # the paths of the siblings are not affected
+        stamp_subtree(obj, generation)
+        return
+
+    if action == "reorder":
+        # reorder is issued by the moved child itself
+        node = node.parent
+    elif action == "remove":
+        stamp_subtree(obj, generation)
+
+    for child in child_nodes(node):
+        stamp_subtree(child, generation)
+
+
+event.structure_changed += update_structure_stamps
+
+
 class RootNode(object):
     @property
     def children(self):
@@ -57,15 +272,29 @@ class RootNode(object):
 
     def path_to(self, child):
         """return the path from this node to its direct child *child*"""
-        return identity_index(self._sections, child),
+        return child_index(self, "_sections", child),
 
 
 class ParentedNode(RootNode):
+    # (structure stamp, path) of the last to_path() call
+    _path_cache = None
+    # bumped by the structural changes of the ancestors
+    # (see update_structure_stamps), invalidating the memoized path
+    _structure_stamp = 0
+
     def to_path(self, parent=None):
-        if self.parent is parent:
-            return self.parent.path_to(self)
+        if parent is not None:
+            if self.parent is parent:
+                return self.parent.path_to(self)
+            return self.parent.to_path(parent) + self.parent.path_to(self)
+
+        cache = self._path_cache
+        if cache is not None and cache[0] == self._structure_stamp:
+            return cache[1]
 
-        return self.parent.to_path(parent) + self.parent.path_to(self)
+        path = self.parent.to_path() + self.parent.path_to(self)
+        self._path_cache = (self._structure_stamp, path)
+        return path
 
     def successor(self):
         return self.parent.children[self.position + 1]
@@ -117,9 +346,9 @@ class SectionNode(ParentedNode):
 
     def path_to(self, child):
         if isinstance(child, BaseProperty):
-            return 1, identity_index(self._props, child)
+            return 1, child_index(self, "_props", child)
 
-        return 0, identity_index(self._sections, child)
+        return 0, child_index(self, "_sections", child)
 
 
 class PropertyNode(ParentedNode):
@@ -131,7 +360,8 @@ class PropertyNode(ParentedNode):
         return self.parent._props[self.position + 1]
 
     def path_to(self, child):
-        return identity_index(self.pseudo_values, child),
+        # value_model.PseudoValues looks values up by identity itself
+        return self.pseudo_values.index(child),
 
 
 class ValueNode(ParentedNode):
@@ -52,51 +52,84 @@ class PropertyModel(TreeModel):
         """
         add some coloring to the value in certain cases
         """
-        val = super(PropertyModel, self).on_get_value(tree_iter, column)
-        if val is None:
-            return val
-
         obj = tree_iter._obj
         if isinstance(tree_iter, ValueIter):
             obj = obj._property
 
-        return self.highlight(obj, val, column)
+        return self.get_markup(tree_iter, column, obj)
 
     def on_iter_n_children(self, tree_iter):
         if tree_iter is None:
-            tree_iter = SectionPropertyIter(self._section)
+            tree_iter = self.node_iter(self._section, SectionPropertyIter)
         return super(PropertyModel, self).on_iter_n_children(tree_iter)
 
     def on_iter_nth_child(self, tree_iter, n):
         if tree_iter is None:
             prop = self._section._props[n]
-            return PropIter(prop)
+            return self.node_iter(prop, PropIter)
         return super(PropertyModel, self).on_iter_nth_child(tree_iter, n)
 
     def _get_node_iter(self, node):
         if isinstance(node, BaseProperty):
-            return PropIter(node)
+            return self.node_iter(node, PropIter)
         if isinstance(node, value_model.Value):
-            return ValueIter(node)
-        return SectionPropertyIter(node)
+            return self.node_iter(node, ValueIter)
+        return self.node_iter(node, SectionPropertyIter)
+
+    def values_changed(self, prop):
+        """
+        notify the view about changed content of all value rows of *prop*
+        """
+        if len(prop.pseudo_values) < 2:
+            return  # the value is displayed in the property row
+
+        path = self.get_node_path(prop)
+        for i in range(len(prop.pseudo_values)):
+            child_path = path + (i,)
+            self.row_changed(child_path, self.get_iter(child_path))
 
     def post_delete(self, parent, old_path):
-        super(PropertyModel, self).post_delete(parent, old_path)
-        if isinstance(parent, BaseProperty):
-            # a value was deleted
-            if len(parent) == 1:
-                # the last child row is also not present anymore,
-                # the value is now displayed inline
-                path = self.get_node_path(parent)
-                self.row_deleted(path + (0,))  # first child
-                self.row_has_child_toggled(path, self.get_iter(path))
+        if not isinstance(parent, BaseProperty):
+            super(PropertyModel, self).post_delete(parent, old_path)
+            return
+
+        # a value was deleted
+        path = self.get_node_path(parent)
+        n_values = len(parent.pseudo_values)
+        if n_values == 1:
+            # both child rows are not present anymore,
+            # the remaining value is now displayed inline
+            self.row_deleted(path + (1,))
+            self.row_deleted(path + (0,))
+            self.row_has_child_toggled(path, self.get_iter(path))
+        elif n_values > 1:
+            self.row_deleted(old_path)
+
+        # the property row displays the first value or <multi>
+        self.row_changed(path, self.get_iter(path))
 
     def post_insert(self, node):
-        # this actually already works fine, since the subtree will always start
-        # collapsed, however in fact we would need to insert an additional row
-        # if the property switched from one value to two values
-        # (the first was displayed inline, but now gets its own row)
-        super(PropertyModel, self).post_insert(node)
+        if not isinstance(node, value_model.Value):
+            super(PropertyModel, self).post_insert(node)
+            return
+
+        # a value was inserted
+        prop = node.parent
+        path = self.get_node_path(prop)
+        n_values = len(prop.pseudo_values)
+        if n_values == 2:
+            # the property switched from one value to two values, the first
+            # was displayed inline, but now both get their own row
+            for i in range(n_values):
+                child_path = path + (i,)
+                self.row_inserted(child_path, self.get_iter(child_path))
+            self.row_has_child_toggled(path, self.get_iter(path))
+        elif n_values > 2:
+            child_path = path + (node.position,)
+            self.row_inserted(child_path, self.get_iter(child_path))
+
+        # the property row displays the first value or <multi>
+        self.row_changed(path, self.get_iter(path))
 
     def on_section_changed(self, context):
         """
@@ -109,6 +142,8 @@ class PropertyModel(TreeModel):
                 isinstance(context.val, BaseSection):
             return
 
+        self.invalidate_markup(context)
+
         if context.action == "set" and context.post_change:
             path = self.get_node_path(context.obj)
             if not path:
@@ -121,6 +156,11 @@ class PropertyModel(TreeModel):
                 print(repr(exc))
                 print(context.dump())
 
+            # changing the dtype converts all values of a property
+            name, _ = context.val
+            if name == "dtype" and isinstance(context.obj, BaseProperty):
+                self.values_changed(context.obj)
+
         # there was some reason we did this, however context.obj can
         # also be a property of the current section
         # if not context.obj is self._section:
@@ -65,33 +65,28 @@ class SectionModel(TreeModel):
             rpath += (0, i)
         section = self._section.from_path(rpath)
         DEBUG("-on_get_iter: %s" % section)
-        return SectionIter(section)
+        return self.node_iter(section, SectionIter)
 
     def on_get_value(self, tree_iter, column):
         """
         add some coloring to the value in certain cases
         """
-        val = super(SectionModel, self).on_get_value(tree_iter, column)
-        if val is None:
-            return val
-
-        obj = tree_iter._obj
-        return self.highlight(obj, val, column)
+        return self.get_markup(tree_iter, column)
 
     def on_iter_n_children(self, tree_iter):
         if tree_iter is None:
-            tree_iter = SectionIter(self._section)
+            tree_iter = self.node_iter(self._section, SectionIter)
         return super(SectionModel, self).on_iter_n_children(tree_iter)
 
     def on_iter_nth_child(self, tree_iter, n):
         if tree_iter == None:
-            return SectionIter(self._section.sections[n])
+            return self.node_iter(self._section.sections[n], SectionIter)
         return super(SectionModel, self).on_iter_nth_child(tree_iter, n)
 
     def _get_node_iter(self, node):
         # no safety checks here, always return a section iter even for the root node
         # (this is required to make n_children work when reordering)
-        return SectionIter(node)
+        return self.node_iter(node, SectionIter)
 
     def destroy(self):
         self._section.remove_change_handler(self.on_section_changed)
@@ -111,6 +106,8 @@ class SectionModel(TreeModel):
         if not context.cur.document is self.document:
             return
 
+        self.invalidate_markup(context)
+
         if context.action == "set" and context.post_change:
             name, value = context.val
             if name == "name":
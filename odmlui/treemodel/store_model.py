@@ -0,0 +1,364 @@
+"""
+The 'store_model' module provides gtk.TreeStore based alternatives to the
+GenericTreeModel based SectionModel and PropertyModel.
+
+The rows of a store mirror an odml document: they hold the rendered markup of
+all columns along with the odml node they display, so gtk can draw and scroll
+them without calling back into python. The mirror is kept in sync incrementally
+by the change events of the document.
+
+A view uses a store instead of its default model, if it is passed as its
+*model_class* e.g.
+
+    PropertyView(registry, model_class=store_model.PropertyStore)
+
+The editor uses the stores when started with --store-models.
+
+A store renders the rows of all nodes when it is created, which takes
+seconds for sections with 100k properties, while the default models only
+render the rows gtk draws. See test/benchmark_store_fill.py.
+"""
+
+import pygtkcompat
+
+from odml.base import Sectionable
+from odml.doc import BaseDocument
+from odml.property import BaseProperty
+from odml.section import BaseSection
+
+import gtk
+import gobject
+
+from .generic_iter import IterCache
+from .tree_model import highlight, highlight_state
+from . import property_model, section_model, value_model
+
+pygtkcompat.enable()
+pygtkcompat.enable_gtk(version='3.0')
+
+
+class StoreModel(gtk.TreeStore):
+    """
+    Base class of the gtk.TreeStore mirrors of odml nodes.
+
+    Besides the displayed columns of the *col_mapper*, each row holds
+    its odml node in an additional column. Subclasses define which
+    children of a node are shown (children_of) and the model path
+    of a node (get_node_path).
+    """
+    def __init__(self, col_mapper, root):
+        self.col_mapper = col_mapper
+        self.node_column = len(col_mapper)
+        self._iters = IterCache()
+        self._section = root
+
+        types = [gobject.TYPE_STRING] * len(col_mapper) + [gobject.TYPE_PYOBJECT]
+        super(StoreModel, self).__init__(*types)
+
+        self.fill(None, root)
+        root.add_change_handler(self.on_section_changed)
+
+    def children_of(self, node):
+        raise NotImplementedError
+
+    def get_node_path(self, node):
+        raise NotImplementedError
+
+    def highlighted_object(self, node):
+        """
+        returns the object, whose state is used to highlight the row of *node*
+        """
+        return node
+
+    def node_iter(self, node, iter_class=None):
+        """
+        returns the custom iter of class *iter_class* for *node*
+        """
+        return self._iters.get(node, iter_class)
+
+    def row_data(self, node):
+        """
+        returns the rendered markup of all columns of the row
+        of *node* followed by the node itself
+        """
+        tree_iter = self.node_iter(node)
+        obj = self.highlighted_object(node)
+        state = highlight_state(obj)
+
+        row = []
+        for column in range(self.node_column):
+            val = tree_iter.get_value(self.col_mapper.name_by_column(column))
+            if val is not None:
+                if isinstance(val, (int, float, bool)):
+                    val = str(val)
+                val = highlight(obj, val, column, state)
+            row.append(val)
+
+        row.append(node)
+        return row
+
+    def fill(self, tree_iter, node):
+        """
+        append the rows of all children of *node* recursively below *tree_iter*
+        """
+        for child in self.children_of(node):
+            self.fill(self.append(tree_iter, self.row_data(child)), child)
+
+    def get_object(self, gtk_tree_iter):
+        """
+        returns the odml node of the row *gtk_tree_iter*
+        """
+        return self.get_value(gtk_tree_iter, self.node_column)
+
+    def on_get_iter(self, path):
+        """
+        returns the custom iter for the node at *path* just as
+        TreeModel.on_get_iter does
+        """
+        return self.node_iter(self.get_object(self.get_iter(path)))
+
+    def get_node_iter(self, node):
+        """
+        returns the gtk.TreeIter of the row of *node* or None
+        """
+        path = self.get_node_path(node)
+        if path:
+            return self.get_iter(path)
+
+    def insert_node(self, node):
+        """
+        insert the row of *node* along with the rows of all its children
+        """
+        path = self.get_node_path(node)
+        parent_iter = None
+        if len(path) > 1:
+            parent_iter = self.get_iter(path[:-1])
+
+        self.fill(self.insert(parent_iter, path[-1], self.row_data(node)), node)
+
+    def update_node(self, node):
+        """
+        render the row of *node* again
+        """
+        tree_iter = self.get_node_iter(node)
+        if tree_iter is not None:
+            self.set_row(tree_iter, node)
+        return tree_iter
+
+    def update_children(self, tree_iter, node):
+        """
+        make sure the rows below *tree_iter* match the current children of *node*
+        """
+        children = self.children_of(node)
+        n_rows = self.iter_n_children(tree_iter)
+        while n_rows > len(children):
+            n_rows -= 1
+            self.remove(self.iter_nth_child(tree_iter, n_rows))
+
+        for i, child in enumerate(children):
+            if i < n_rows:
+                self.set_row(self.iter_nth_child(tree_iter, i), child)
+            else:
+                self.fill(self.append(tree_iter, self.row_data(child)), child)
+
+    def set_row(self, tree_iter, node):
+        for column, val in enumerate(self.row_data(node)):
+            self.set_value(tree_iter, column, val)
+
+    def refresh(self):
+        """
+        render all rows again, e.g. after terminologies have been loaded
+        """
+        def set_row(model, path, tree_iter, data=None):
+            self.set_row(tree_iter, self.get_object(tree_iter))
+
+        self.foreach(set_row)
+
+    def event_remove(self, context):
+        """
+        handles action="remove" events, be sure to call this method
+        for both pre_change and post_change events.
+        """
+        if not hasattr(context, "path"):
+            context.path = {}
+        if context.pre_change:
+            context.path[self] = self.get_node_path(context.val)
+        if context.post_change:
+            path = context.path.pop(self, None)
+            if path:
+                self.remove(self.get_iter(path))
+
+    def destroy(self):
+        self._section.remove_change_handler(self.on_section_changed)
+
+
+class SectionStore(StoreModel):
+    """
+    gtk.TreeStore mirror of the sections of a document,
+    see section_model.SectionModel
+    """
+    def __init__(self, odml_document):
+        # otherwise bad things happen
+        assert isinstance(odml_document, BaseDocument)
+
+        super(SectionStore, self).__init__(section_model.COL_MAPPER, odml_document)
+
+    @property
+    def document(self):
+        return self._section
+
+    def children_of(self, node):
+        return node.sections
+
+    def get_node_path(self, node):
+        if node is self._section:
+            return ()
+
+        # (a,0,b,0,c) -> (a,b,c)
+        path = node.to_path()
+        return (path[0],) + path[2::2]
+
+    def on_section_changed(self, context):
+        """
+        apply the changes of sections to the mirror
+        """
+        if not isinstance(context.obj, Sectionable):
+            return
+
+        if not context.cur.document is self.document:
+            return
+
+        if context.action == "set" and context.post_change:
+            if context.obj is not self._section:
+                self.update_node(context.obj)
+
+        if not isinstance(context.val, Sectionable):
+            return
+
+        if context.action == "remove":
+            self.event_remove(context)
+
+        if (context.action == "append" or context.action == "insert") and \
+                context.post_change:
+            self.insert_node(context.val)
+
+
+class PropertyStore(StoreModel):
+    """
+    gtk.TreeStore mirror of the properties of a section and their values,
+    see property_model.PropertyModel
+    """
+    def __init__(self, section):
+        super(PropertyStore, self).__init__(property_model.COL_MAPPER, section)
+
+    def __repr__(self):
+        return "<PropertyStore of %s>" % self.section
+
+    @property
+    def section(self):
+        return self._section
+
+    def children_of(self, node):
+        if node is self._section:
+            return node.properties
+
+        # properties with only one value display it inline
+        if isinstance(node, BaseProperty) and len(node.pseudo_values) > 1:
+            return node.pseudo_values
+
+        return []
+
+    def update_node(self, node):
+        """
+        render the row of *node* again along with the rows of its values,
+        which might have been added or removed
+        """
+        tree_iter = super(PropertyStore, self).update_node(node)
+        if tree_iter is not None:
+            self.update_children(tree_iter, node)
+        return tree_iter
+
+    def highlighted_object(self, node):
+        if isinstance(node, value_model.Value):
+            return node.parent
+        return node
+
+    def get_node_path(self, node):
+        if node is self._section:
+            return ()
+
+        if isinstance(node, value_model.Value):
+            prop = node.parent
+            if len(prop.pseudo_values) == 1:
+                return (prop.position,)
+            return (prop.position, node.position)
+
+        return (node.position,)
+
+    def on_section_changed(self, context):
+        """
+        apply the changes of properties and values to the mirror
+        """
+        # we are only interested in changes going up to the section level,
+        # but not those dealing with subsections of ours
+        if context.cur is not self._section or \
+                isinstance(context.val, BaseSection):
+            return
+
+        if context.action == "set" and context.post_change:
+            if isinstance(context.obj, value_model.Value):
+                self.update_value(context.obj)
+            elif context.obj is not self._section:
+                self.update_node(context.obj)
+
+        if context.action == "reorder" and context.post_change and \
+                isinstance(context.obj, value_model.Value):
+            self.update_node(context.obj.parent)
+
+        if isinstance(context.val, value_model.Value):
+            self.event_value(context)
+            return
+
+        if context.action == "remove":
+            self.event_remove(context)
+
+        if (context.action == "append" or context.action == "insert") and \
+                context.post_change:
+            self.insert_node(context.val)
+
+    def update_value(self, val):
+        """
+        render the row of the value *val* and the row of its property again
+        """
+        prop = val.parent
+        if len(prop.pseudo_values) > 1:
+            super(PropertyStore, self).update_node(val)
+        # the property row displays the first value or <multi>
+        super(PropertyStore, self).update_node(prop)
+
+    def event_value(self, context):
+        """
+        handles the insertion and removal of values, be sure to call
+        this method for both pre_change and post_change events.
+        """
+        val = context.val
+        prop = val.parent
+        if context.action == "remove" and context.pre_change:
+            self.event_remove(context)
+        if not context.post_change:
+            return
+
+        if len(prop.pseudo_values) < 3:
+            # the values might have switched between being displayed
+            # inline and in rows of their own
+            if context.action == "remove":
+                context.path.pop(self, None)
+            self.update_node(prop)
+            return
+
+        if context.action == "remove":
+            self.event_remove(context)
+        elif context.action == "append" or context.action == "insert":
+            self.insert_node(val)
+
+        super(PropertyStore, self).update_node(prop)
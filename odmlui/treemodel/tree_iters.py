@@ -13,6 +13,7 @@ class PropIter(generic_iter.GenericIter):
 
     As odML supports multi-values, each property may or may not have multiple children.
     """
+    __slots__ = ()
 
     def get_value(self, attr):
         if attr == "pseudo_values":
@@ -38,7 +39,7 @@ class PropIter(generic_iter.GenericIter):
         if not hasattr(self._obj, "pseudo_values") or not self._obj.pseudo_values:
             return ""
 
-        return ValueIter(self._obj.pseudo_values[0]).get_value(name)
+        return self.new_iter(self._obj.pseudo_values[0]).get_value(name)
 
     @property
     def has_child(self):
@@ -60,6 +61,7 @@ class ValueIter(generic_iter.GenericIter):
     """
     An iterator for a Value object
     """
+    __slots__ = ()
 
     def get_value(self, attr):
 
@@ -86,6 +88,8 @@ class ValueIter(generic_iter.GenericIter):
 
 
 class SectionIter(generic_iter.GenericIter):
+    __slots__ = ()
+
     @property
     def parent(self):
         if not self._obj.parent:
@@ -96,6 +100,8 @@ class SectionIter(generic_iter.GenericIter):
 
 
 class SectionPropertyIter(generic_iter.GenericIter):
+    __slots__ = ()
+
     @property
     def n_children(self):
         return len(self._obj.properties)
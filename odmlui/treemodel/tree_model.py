@@ -1,9 +1,17 @@
 import sys
 
+from collections import OrderedDict
+
 import pygtkcompat
 import gtk
 import gobject
 
+import odml.terminology as terminology
+
+from .. import terminology_index
+from . import event
+from .generic_iter import IterCache
+
 pygtkcompat.enable()
 pygtkcompat.enable_gtk(version='3.0')
 
@@ -40,13 +48,169 @@ class ColumnMapper(object):
         return len(self._col_map)
 
 
+def highlight_state(obj):
+    """
+    returns the merged equivalent, the terminology equivalent and the
+    highest validation severity (or -1) of obj, which determine how
+    the cells of its row are highlighted
+    """
+    warning = -1
+    doc = obj.document
+    if doc is not None and hasattr(doc, "validation_index"):
+        warning = doc.validation_index.severity(obj)
+
+    return (terminology_index.merged_equivalent(obj),
+            terminology_index.terminology_equivalent(obj),
+            warning)
+
+
+def highlight(obj, value, column=0, state=None):
+    """
+    highlights value depending on whether obj is merged
+    or a terminology default etc.
+
+    *state* is the highlight_state() of obj, if it is already known
+    e.g. since the other columns of its row have been highlighted.
+    """
+    if state is None:
+        state = highlight_state(obj)
+    merged, term, warning = state
+
+    color = None
+    italics = False
+    if merged is not None:
+        if column == 0:
+            color = "darkgrey"
+        if merged == obj:
+            color = "grey"
+
+    if column == 0 and term is not None:
+        italics = True
+
+    if italics:
+        value = "<i>%s</i>" % value
+
+    # check for validation errors
+    if column == 0:
+
+        if warning >= 0:
+            warn = "\u26A0"
+            if sys.version_info.major < 3:
+                # Even with decode the warning symbol is not properly displayed
+                # in py2 when using the tree model. Using a workaround for now.
+                # warn = warn.decode('unicode-escape')
+                warn = "(!)"
+            colors = ['orange', 'red']
+            value = "%s <span foreground='%s'>%s</span>" % (value, colors[warning], warn)
+
+    if color is None:
+        return value
+    return "<span foreground='%s'>%s</span>" % (color, value)
+
+
+# Attributes of sections and documents, which the highlighting of all
+# rows below them depends on: the terminology equivalents are looked up
+# by section type and (inherited) repository, include and link merge
+# sections. Setting any of them bumps the generation.
+HIGHLIGHT_ATTRIBUTES = frozenset(["type", "repository", "include", "link"])
+highlight_generation = 0
+
+
+def on_highlight_changed(context):
+    """
+    handler for the changes of all documents bumping the highlight
+    generation, once a section or document attribute listed in
+    HIGHLIGHT_ATTRIBUTES has been set
+    """
+    global highlight_generation
+
+    if context.action != "set" or not context.post_change or \
+            context.val[0] not in HIGHLIGHT_ATTRIBUTES:
+        return
+    if isinstance(context.obj, (event.Section, event.Document)):
+        highlight_generation += 1
+
+
+event.Document._Changed += on_highlight_changed
+
+
+class MarkupCache(object):
+    """
+    A size bounded cache of the rendered markup of cells per (node, column),
+    evicting the least recently used entries first.
+
+    Entries hold a reference to their node, so a recycled object id can
+    never return the markup of a different node.
+    """
+    def __init__(self, n_columns, size):
+        self.n_columns = n_columns
+        self.size = size
+        self._entries = OrderedDict()
+        self._terminologies = self.terminology_state()
+
+    @staticmethod
+    def terminology_state():
+        return (len(terminology.terminologies), terminology_index.generation,
+                highlight_generation)
+
+    def get(self, node, column):
+        """
+        returns the cached markup of *column* of *node* or None
+        """
+        # highlighting depends on the terminologies, which are loaded in
+        # the background. Start over, once another one is available,
+        # they have been refreshed or an attribute deciding about the
+        # terminology of some rows has been set.
+        state = self.terminology_state()
+        if self._terminologies != state:
+            self._terminologies = state
+            self.clear()
+            return None
+
+        key = (id(node), column)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] is not node:
+            return None
+
+        # mark the entry as the most recently used one
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, node, column, markup):
+        self._entries[(id(node), column)] = (node, markup)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, node):
+        """
+        drop the markup of all columns of *node*
+        """
+        for column in range(self.n_columns):
+            self._entries.pop((id(node), column), None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
 class TreeModel(gtk.GenericTreeModel):
     offset = 0  # number of elements to be cutoff from TreeIter paths
+    markup_cache_size = 20000  # max number of cached cell markups
 
     def __init__(self, col_mapper):
         self.col_mapper = col_mapper
+        self._iters = IterCache()
+        self._markup = MarkupCache(len(col_mapper), self.markup_cache_size)
         gtk.GenericTreeModel.__init__(self)
 
+    def node_iter(self, node, iter_class=None):
+        """
+        returns the (shared) custom iter of class *iter_class* for *node*
+        """
+        return self._iters.get(node, iter_class)
+
     def get_object(self, gtk_tree_iter):
         """
         gtk has its on special tree_iter that don't do our cool stuff
@@ -62,44 +226,53 @@ class TreeModel(gtk.GenericTreeModel):
         highlights value depending on whether obj is merged
         or a terminology default etc.
         """
-        color = None
-        italics = False
-        merged = obj.get_merged_equivalent()
-        if merged is not None:
-            if column == 0:
-                color = "darkgrey"
-            if merged == obj:
-                color = "grey"
-
-        merged = obj.get_terminology_equivalent()
-        if column == 0 and merged is not None:
-            italics = True
-
-        if italics:
-            value = "<i>%s</i>" % value
-
-        # check for validation errors
-        if column == 0:
-            warning = -1
-            doc = obj.document
-            if doc is not None and hasattr(doc, "validation_result"):
-                for err in doc.validation_result.errors:
-                    if err.obj is obj:
-                        warning = max(warning, 1 if err.is_error else 0)
-
-            if warning >= 0:
-                warn = "\u26A0"
-                if sys.version_info.major < 3:
-                    # Even with decode the warning symbol is not properly displayed
-                    # in py2 when using the tree model. Using a workaround for now.
-                    # warn = warn.decode('unicode-escape')
-                    warn = "(!)"
-                colors = ['orange', 'red']
-                value = "%s <span foreground='%s'>%s</span>" % (value, colors[warning], warn)
-
-        if color is None:
-            return value
-        return "<span foreground='%s'>%s</span>" % (color, value)
+        return highlight(obj, value, column)
+
+    def get_markup(self, tree_iter, column, obj=None):
+        """
+        returns the highlighted value of *column* for *tree_iter*
+
+        *obj* is the object to be highlighted, it defaults to the
+        object of *tree_iter*. Results are cached until a change event
+        of the object invalidates them (see invalidate_markup).
+        """
+        node = tree_iter._obj
+        markup = self._markup.get(node, column)
+        if markup is not None:
+            return markup
+
+        val = TreeModel.on_get_value(self, tree_iter, column)
+        if val is None:
+            return val
+
+        markup = self.highlight(node if obj is None else obj, val, column)
+        self._markup.set(node, column, markup)
+        return markup
+
+    def invalidate_markup(self, context):
+        """
+        drop the cached markup of all rows affected by the change *context*
+        """
+        if not context.post_change:
+            return
+
+        nodes = [context.obj]
+        if context.action == "remove":
+            nodes.append(context.val)
+        elif context.action == "reorder":
+            nodes.append(context.obj.parent)
+
+        for node in nodes:
+            self._markup.invalidate(node)
+            # values are displayed highlighted like their property, a
+            # property row also shows its first value
+            if hasattr(node, "_property"):
+                self._markup.invalidate(node.parent)
+            elif context.action in ("set", "reorder") and \
+                    hasattr(node, "pseudo_values"):
+                # markup is only cached for values, that have been displayed
+                for val in node.pseudo_values.materialized():
+                    self._markup.invalidate(val)
 
     def on_get_flags(self):
         return 0
@@ -234,8 +407,8 @@ class TreeModel(gtk.GenericTreeModel):
             if not hasattr(context.val[0].parent, 'properties') and \
                     not hasattr(context.val[0].parent, 'author'):
                 (value, new_index) = context.val
-                child_list = value.parent.values
-                old_index = child_list.index(getattr(value, "value"))
+                child_list = value.parent.pseudo_values
+                old_index = value.index
             elif hasattr(context.val[0].parent, 'author'):
                 (sec, new_index) = context.val
                 child_list = sec.parent.sections
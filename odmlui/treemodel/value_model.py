@@ -22,6 +22,15 @@ class ValueFormat(format.Format):
     _map = {}
 
 
+def pass_on_change_value(context):
+    """
+    pass the change event to the property of the value, unless
+    the value is not part of it (yet or anymore)
+    """
+    if not context.cur._detached:
+        event.pass_on_change(context)
+
+
 class Value(BaseObject, ValueNode, event.ModificationNotifier):
     """
     Since the odML value node has been merged with the odml.Property, and is
@@ -36,23 +45,21 @@ class Value(BaseObject, ValueNode, event.ModificationNotifier):
 
     """
     _Changed = event.Event("value")
-    _Changed.finish = event.pass_on_change
+    _Changed.finish = pass_on_change_value
     _format = ValueFormat
 
     def __init__(self, parent, index=None):
 
         self._property = parent
+        # A value, that is not part of the property (yet or anymore) keeps its
+        # content itself. It is added to the property by property.append(value)
+        # or property.insert(index, value), so the change events are fired.
+        self._detached = index is None
+        self._content = None
         # Instantiate a new odML value
         if index is None:
-            index = len(self._property.values)
-            dtype = self.parent.dtype
-            default_value = dtypes.default_values(dtype)
-            # property.values returns a copy: we therefore need an in between step
-            # to append a new value and reassign the modified value to the parent
-            # property.values.
-            val_cp = self.parent.values
-            val_cp.append(default_value)
-            self.parent.values = val_cp
+            index = len(self._property.pseudo_values)
+            self._content = dtypes.default_values(self.parent.dtype)
 
         assert(isinstance(index, int))
         self._index = index
@@ -99,20 +106,20 @@ class Value(BaseObject, ValueNode, event.ModificationNotifier):
         """
             Return a single element from the parent property's value list.
         """
+        if self._detached:
+            return self._content
         return self.parent._values[self._index]
 
     @pseudo_values.setter
     def pseudo_values(self, new_string):
         """
             First, try to check if the new value fits in the parent property's
-            dtype. If it does, then update the value.
+            dtype. If it does, then update the value in place.
         """
-        prop_dtype = self.parent.dtype
-        new_value = dtypes.get(new_string, prop_dtype)
-
-        set_values = self.parent.values
-        set_values[self._index] = new_value
-        self.parent.values = set_values
+        if self._detached:
+            self._content = dtypes.get(new_string, self.dtype)
+            return
+        event.set_value(self.parent, self._index, new_string)
 
     @property
     def value(self):
@@ -163,5 +170,126 @@ class Value(BaseObject, ValueNode, event.ModificationNotifier):
 
     def clone(self):
         obj = BaseObject.clone(self)
+        obj._content = self.pseudo_values
+        obj._detached = True
         obj._property = None
         return obj
+
+
+class PseudoValues(object):
+    """
+    The list of Value wrappers of a property, used as its `pseudo_values`.
+
+    Wrappers are only created once an index is accessed, so properties
+    holding large arrays do not need a full BaseObject per value.
+    Created wrappers are kept, so the same index always yields the same
+    object as long as the list is not modified.
+    """
+    def __init__(self, prop, length=None):
+        self._property = prop
+        self._len = len(prop._values) if length is None else length
+        self._items = {}
+
+    def _position(self, index):
+        if index < 0:
+            index += self._len
+        if index < 0 or index >= self._len:
+            raise IndexError("pseudo_values index out of range")
+        return index
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+
+        index = self._position(index)
+        val = self._items.get(index)
+        if val is None:
+            val = self._items[index] = Value(self._property, index)
+        return val
+
+    def __setitem__(self, index, val):
+        self._items[self._position(index)] = val
+
+    def __delitem__(self, index):
+        """
+        remove the wrapper at *index*, the wrappers of all subsequent
+        values move up and get their index updated accordingly
+        """
+        index = self._position(index)
+        items = {}
+        for pos, val in self._items.items():
+            if pos > index:
+                pos -= 1
+                val._index = pos
+            elif pos == index:
+                continue
+            items[pos] = val
+
+        self._items = items
+        self._len -= 1
+
+    def __iter__(self):
+        for index in range(self._len):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, PseudoValues):
+            other = list(other)
+        return list(self) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "<PseudoValues of %s (%d values, %d materialized)>" % \
+               (repr(self._property), self._len, len(self._items))
+
+    def insert(self, index, val):
+        """
+        insert the wrapper *val* at *index*, the wrappers of all subsequent
+        values move down and get their index updated accordingly
+        """
+        index = max(0, min(index, self._len))
+        items = {}
+        for pos, item in self._items.items():
+            if pos >= index:
+                pos += 1
+                item._index = pos
+            items[pos] = item
+
+        items[index] = val
+        val._index = index
+        self._items = items
+        self._len += 1
+
+    def append(self, val):
+        self.insert(self._len, val)
+
+    def pop(self, index=-1):
+        val = self[index]
+        del self[index]
+        return val
+
+    def index(self, val):
+        """
+        returns the position of the wrapper *val* (compared by identity)
+        """
+        pos = getattr(val, "_index", None)
+        if pos is not None and self._items.get(pos) is val:
+            return pos
+
+        for pos, item in self._items.items():
+            if item is val:
+                return pos
+
+        raise ValueError("%s is not in the pseudo_values of %s" %
+                         (repr(val), repr(self._property)))
+
+    def materialized(self):
+        """
+        returns the wrappers created so far
+        """
+        return list(self._items.values())
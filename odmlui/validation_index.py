@@ -0,0 +1,67 @@
+"""
+The 'validation_index' module provides the 'ValidationIndex' class.
+
+It provides constant time lookups of the validation messages
+of a document by the odml object that caused them.
+"""
+
+
+class ValidationIndex(object):
+    """
+    Lookup table of the messages of an odml.validation.Validation
+    by the object that caused them.
+
+    Objects are referenced by id, which is safe since the messages
+    hold a reference to their objects for as long as the index lives.
+    """
+    WARNING = 0
+    ERROR = 1
+
+    def __init__(self, validation):
+        self.validation = validation
+        self._errors = {}
+        self._severity = {}
+        self._objects = {}
+
+        for err in validation.errors:
+            self.add(err)
+
+    def add(self, err):
+        """
+        Add the validation message *err* to the index.
+        """
+        key = id(err.obj)
+        self._errors.setdefault(key, []).append(err)
+        self._objects[key] = err.obj
+
+        severity = self.ERROR if err.is_error else self.WARNING
+        self._severity[key] = max(self._severity.get(key, severity), severity)
+
+    def severity(self, obj):
+        """
+        :return: the highest severity of all messages of *obj*,
+                 ERROR, WARNING or -1 if there are none.
+        """
+        return self._severity.get(id(obj), -1)
+
+    def __getitem__(self, obj):
+        """
+        :return: list of all validation messages of *obj*.
+        """
+        return self._errors.get(id(obj), [])
+
+    def changed(self, other):
+        """
+        :return: list of the objects whose messages differ
+                 between this index and the index *other*.
+        """
+        objects = []
+        for key in set(self._errors) | set(other._errors):
+            old = [(err.rank, err.msg) for err in self._errors.get(key, [])]
+            new = [(err.rank, err.msg) for err in other._errors.get(key, [])]
+            if old != new:
+                objects.append(self._objects.get(key, other._objects.get(key)))
+        return objects
+
+    def __len__(self):
+        return len(self._errors)
@@ -133,4 +133,6 @@ class ValidationWindow(gtk.Window):
         the tab the validation was called for.
         """
         ValidationWindow.width, ValidationWindow.height = self.get_size()
+        if self.tab.validation_window is self:
+            self.tab.validation_window = None
         self.tab.remove_validation()
@@ -16,9 +16,9 @@ import odml.terminology as terminology
 import gtk
 
 from .helpers import handle_property_import, get_username
-from .treemodel.section_model import SectionModel
 from .section_view import SectionView
 from .scrolled_window import ScrolledWindow
+from .treemodel import event
 
 pygtkcompat.enable()
 pygtkcompat.enable_gtk(version='3.0')
@@ -256,7 +256,7 @@ class SectionPage(Page):
         if "repository" in data.keys() and data["repository"].strip():
             try:
                 self.term = terminology.terminologies.load(data["repository"])
-                self.view.set_model(SectionModel(self.term))
+                self.view.set_model(self.view.model_class(self.term))
                 reset = False
             except AssertionError:
                 # Handle terminology loading error
@@ -367,35 +367,37 @@ class DocumentWizard:
         The process is finished, create the new document empty or with
         any selected Terminology Sections.
         """
-        doc = odml.Document()
+        # The document is built from scratch, nobody needs to follow the changes.
+        with event.quiet():
+            doc = odml.Document()
 
-        # Set the document attributes with data from the first page
-        for key, val in self.data_page.data.items():
-            setattr(doc, key, val)
+            # Set the document attributes with data from the first page
+            for key, val in self.data_page.data.items():
+                setattr(doc, key, val)
 
-        # All selected sections and their properties need to be cloned from the
-        # terminology and added at the appropriate position in the new document tree.
-        if hasattr(self.section_page, "term") and self.section_page.term:
-            term = self.section_page.term
+            # All selected sections and their properties need to be cloned from the
+            # terminology and added at the appropriate position in the new document tree.
+            if hasattr(self.section_page, "term") and self.section_page.term:
+                term = self.section_page.term
 
-            # Use terminology as scaffold to create the new document
-            term.new_doc_sec = doc
-            for term_sec in term.itersections(recursive=True):
-                if term_sec not in self.section_page.sections:
-                    continue
+                # Use terminology as scaffold to create the new document
+                term.new_doc_sec = doc
+                for term_sec in term.itersections(recursive=True):
+                    if term_sec not in self.section_page.sections:
+                        continue
 
-                new_sec = term_sec.clone(children=False)
-                for prop in term_sec.properties:
-                    cprop = prop.clone()
+                    new_sec = term_sec.clone(children=False)
+                    for prop in term_sec.properties:
+                        cprop = prop.clone()
 
-                    # All new properties need to be adjusted to odml-ui needs!
-                    handle_property_import(cprop)
+                        # All new properties need to be adjusted to odml-ui needs!
+                        handle_property_import(cprop)
 
-                    new_sec.append(cprop)
+                        new_sec.append(cprop)
 
-                term_sec.new_doc_sec = new_sec
-                if hasattr(term_sec.parent, "new_doc_sec"):
-                    term_sec.parent.new_doc_sec.append(new_sec)
+                    term_sec.new_doc_sec = new_sec
+                    if hasattr(term_sec.parent, "new_doc_sec"):
+                        term_sec.parent.new_doc_sec.append(new_sec)
 
         self.finish(doc)
 
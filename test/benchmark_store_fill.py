@@ -0,0 +1,86 @@
+"""
+Benchmark for creating the tree models of a large property list.
+
+Creates a PropertyStore, which renders the rows of all properties and
+values into its gtk.TreeStore up front (StoreModel.fill), and a
+PropertyModel, which renders rows only when gtk queries them, for a section
+with many properties. For the PropertyModel the rows visible in a
+window are queried once, as a GtkTreeView does when it is first drawn.
+
+Run with:
+
+    python test/benchmark_store_fill.py [number of properties]
+"""
+
+import sys
+import time
+
+import odml
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities (Document, Section, Property).
+import odmlui.treemodel.mixin
+
+from odmlui.helpers import handle_section_import
+from odmlui.treemodel.property_model import PropertyModel
+from odmlui.treemodel.store_model import PropertyStore
+
+
+def create_section(n_props, n_values=3):
+    doc = odml.Document()
+    sec = odml.Section(name="sec", type="test", parent=doc)
+
+    props = []
+    for i in range(n_props):
+        # every tenth property has several values, displayed in rows of their own
+        values = list(range(n_values)) if i % 10 == 0 else [i]
+        prop = odml.Property(name="prop_%d" % i, values=values)
+        prop._parent = sec
+        props.append(prop)
+
+    # Section.append checks the names of all properties, which
+    # takes hours for large sections. The names are unique anyway.
+    list.extend(sec._props, props)
+    handle_section_import(sec)
+    return sec
+
+
+def draw(model, n_rows=50):
+    """
+    query the first *n_rows* rows of *model* like a GtkTreeView
+    does when it draws them
+    """
+    child = model.on_iter_nth_child(None, 0)
+    for _ in range(n_rows):
+        if child is None:
+            break
+        model.on_get_path(child)
+        for column in range(model.on_get_n_columns()):
+            model.on_get_value(child, column)
+        model.on_iter_has_child(child)
+        child = model.on_iter_next(child)
+
+
+def measure(func, *args):
+    start = time.time()
+    result = func(*args)
+    return time.time() - start, result
+
+
+def main():
+    n_props = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    sec = create_section(n_props)
+
+    seconds, store = measure(PropertyStore, sec)
+    print("%-28s %8.3f s (%d rows)" % ("PropertyStore (eager fill)", seconds,
+                                       n_props + n_props // 10 * 3))
+    store.destroy()
+
+    seconds, model = measure(PropertyModel, sec)
+    draw_seconds, _ = measure(draw, model)
+    print("%-28s %8.3f s" % ("PropertyModel (first draw)", seconds + draw_seconds))
+    model.destroy()
+
+
+if __name__ == "__main__":
+    main()
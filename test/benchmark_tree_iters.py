@@ -0,0 +1,183 @@
+"""
+Micro-benchmark for the tree iterators of the odmlui tree models.
+
+Walks a SectionModel and the PropertyModels of all sections the way a
+GtkTreeView queries them during an expose event and reports the number of
+iterators created, the time and the peak traced memory per full walk, once
+the first walk has been done.
+
+The walk is run against the odmlui package of the working tree and against
+the package of a baseline revision exported from git, each in a process of
+its own. By default the baseline is the revision before the per-model
+iterator cache (odmlui.treemodel.generic_iter.IterCache) was introduced.
+The number of iterators is due to the cache alone, the time and memory
+reflect all changes between the two revisions.
+
+Run with:
+
+    python test/benchmark_tree_iters.py [baseline revision]
+"""
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_document(n_sections=20, n_sub=5, n_props=50, n_values=3):
+    import odml
+    from odmlui.helpers import handle_section_import
+
+    doc = odml.Document()
+    for i in range(n_sections):
+        sec = odml.Section(name="sec_%d" % i, parent=doc)
+        for j in range(n_sub):
+            odml.Section(name="sub_%d" % j, parent=sec)
+        for j in range(n_props):
+            odml.Property(name="prop_%d" % j, values=list(range(n_values)), parent=sec)
+        handle_section_import(sec)
+    return doc
+
+
+def walk(model, tree_iter=None):
+    """
+    query every row of *model* below *tree_iter* like a GtkTreeView would
+    """
+    if tree_iter is None:
+        child = model.on_iter_nth_child(None, 0)
+    else:
+        child = model.on_iter_children(tree_iter)
+
+    while child is not None:
+        model.on_get_path(child)
+        for column in range(model.on_get_n_columns()):
+            model.on_get_value(child, column)
+        model.on_iter_parent(child)
+        if model.on_iter_has_child(child):
+            model.on_iter_n_children(child)
+            walk(model, child)
+        child = model.on_iter_next(child)
+
+
+def walk_all(models):
+    for model in models:
+        walk(model)
+
+
+def measure(repeat=5):
+    """
+    measure the walks with the odmlui package found first on sys.path
+
+    :return: dict of the iterators created, the seconds and
+             the peak traced bytes per walk
+    """
+    # Import is required to use the event capable odmlui implementation
+    # of odml entities (Document, Section, Property).
+    import odmlui.treemodel.mixin
+
+    from odmlui.treemodel.generic_iter import GenericIter
+    from odmlui.treemodel.property_model import PropertyModel
+    from odmlui.treemodel.section_model import SectionModel
+
+    doc = create_document()
+    models = [SectionModel(doc)]
+    for sec in doc.sections:
+        models.append(PropertyModel(sec))
+
+    # gtk holds a reference to every iterator handed out to it,
+    # which keeps the iterators of the first walk in the cache
+    held = []
+    init = GenericIter.__init__
+
+    def holding_init(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        held.append(self)
+
+    GenericIter.__init__ = holding_init
+    walk_all(models)
+
+    created = [0]
+
+    def counting_init(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        created[0] += 1
+
+    GenericIter.__init__ = counting_init
+    walk_all(models)
+    GenericIter.__init__ = init
+
+    start = time.time()
+    for _ in range(repeat):
+        walk_all(models)
+    seconds = time.time() - start
+
+    tracemalloc.start()
+    walk_all(models)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"iterators": created[0], "seconds": seconds / repeat, "peak": peak}
+
+
+def default_baseline():
+    """
+    :return: the revision before the iterator cache was introduced
+    """
+    commits = subprocess.check_output(
+        ["git", "log", "--format=%H", "-S", "class IterCache", "--",
+         "odmlui/treemodel/generic_iter.py"], cwd=REPO).split()
+    return commits[-1].decode() + "~1"
+
+
+def export(revision, directory):
+    """
+    extract the odmlui package of *revision* into *directory*
+    """
+    archive = subprocess.check_output(["git", "archive", revision, "odmlui"], cwd=REPO)
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+
+
+def run(package_root):
+    """
+    measure the walks in a new process importing odmlui from *package_root*
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [package_root] + [path for path in [env.get("PYTHONPATH")] if path])
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__),
+                                      "--measure"], env=env, cwd=package_root)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    if sys.argv[1:] == ["--measure"]:
+        print(json.dumps(measure()))
+        return
+
+    baseline = sys.argv[1] if len(sys.argv) > 1 else default_baseline()
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        export(baseline, tmp_dir)
+        revision = subprocess.check_output(["git", "rev-parse", "--short", baseline],
+                                           cwd=REPO).decode().strip()
+        results = [("baseline %s" % revision, run(tmp_dir)),
+                   ("working tree", run(REPO))]
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    for name, result in results:
+        print("%-22s %8d iterators/walk %10.4f s/walk %12d peak traced bytes/walk" %
+              (name, result["iterators"], result["seconds"], result["peak"]))
+
+
+if __name__ == "__main__":
+    main()
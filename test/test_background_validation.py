@@ -0,0 +1,168 @@
+"""
+Tests for odmlui.background_validation.
+"""
+
+import unittest
+
+import odml
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities (Document, Section, Property).
+import odmlui.treemodel.mixin
+
+from odmlui import background_validation
+from odmlui.background_validation import BackgroundValidation, \
+        create_validation, partial_snapshot, snapshot, validate_partial, \
+        validate_snapshot
+
+
+class TestBackgroundValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.doc = odml.Document()
+        self.sec = odml.Section(name="sec", parent=self.doc)
+        # a missing section type causes a warning
+        self.prop = odml.Property(name="prop", parent=self.sec)
+
+    def test_snapshot(self):
+        events = []
+        self.doc.add_change_handler(events.append)
+
+        clone, mapping = snapshot(self.doc)
+        self.assertEqual([], events)
+        self.assertIsNot(self.sec, clone.sections[0])
+        self.assertIs(self.sec, mapping[id(clone.sections[0])])
+        self.assertIs(self.prop, mapping[id(clone.sections[0].properties[0])])
+
+        # editing the clone does not notify the views of the original
+        clone.sections[0].name = "renamed"
+        self.assertEqual([], events)
+        self.assertEqual("sec", self.sec.name)
+
+    def test_validate_snapshot(self):
+        clone, mapping = snapshot(self.doc)
+        results = validate_snapshot(clone, mapping)
+        validation = create_validation(self.doc, results)
+
+        self.assertIs(self.doc, validation.obj)
+        self.assertTrue(validation.errors)
+        self.assertIn(id(self.sec), results)
+        originals = (self.doc, self.sec, self.prop)
+        for err in validation.errors:
+            self.assertTrue(any(err.obj is obj for obj in originals))
+
+    def test_partial_snapshot(self):
+        sub = odml.Section(name="sub", parent=self.sec)
+        odml.Section(name="subsub", parent=sub)
+        prop = odml.Property(name="prop", parent=sub)
+        sibling = odml.Property(name="sibling", parent=sub)
+        odml.Section(name="other", parent=self.doc)
+
+        events = []
+        self.doc.add_change_handler(events.append)
+        clones, mapping = partial_snapshot([sub, prop])
+        self.assertEqual([], events)
+        self.assertIs(sub, mapping[id(clones[0])])
+        self.assertIs(prop, mapping[id(clones[1])])
+
+        # sections come with their children, properties with their siblings
+        self.assertEqual(["subsub"], [sec.name for sec in clones[0].sections])
+        self.assertEqual(["prop", "sibling"],
+                         [prop.name for prop in clones[0].properties])
+        self.assertEqual([], clones[0].sections[0].sections)
+        self.assertIs(sibling, mapping[id(clones[0].properties["sibling"])])
+
+        # the parents are cloned without their other children
+        self.assertEqual(["sub"], [sec.name for sec in clones[0].parent.sections])
+        self.assertEqual([], clones[0].parent.properties)
+        self.assertEqual(["sec"], [sec.name for sec in clones[0].document.sections])
+
+        results = validate_partial(clones, mapping, {})
+        self.assertIn(id(sub), results)
+        self.assertTrue(all(err.obj is sub for err in results[id(sub)][1]))
+
+    def test_incremental(self):
+        sub = odml.Section(name="sub", type="type", parent=self.sec)
+        prop = odml.Property(name="prop", parent=sub)
+
+        validations = []
+        engine = BackgroundValidation(self.doc, validations.append)
+        engine.deliver(validate_snapshot(*snapshot(self.doc)), engine.generation)
+        self.assertFalse(engine.full)
+        self.assertIsNotNone(engine.current)
+        self.assertIn(id(self.sec), engine.results)
+
+        # only the object and its parent section are validated again
+        prop.definition = "definition"
+        self.assertIsNone(engine.current)
+        self.assertEqual(set([id(prop), id(sub)]), set(engine.dirty))
+        self.assertFalse(engine.full)
+
+        sub.type = None
+        engine.deliver(validate_partial(*engine.prepare_update()), engine.generation)
+        self.assertEqual({}, engine.dirty)
+        self.assertEqual({}, engine.pending)
+        self.assertIs(validations[-1], engine.current)
+        self.assertIn(id(sub), engine.results)
+        self.assertIn(id(self.sec), engine.results)
+
+        # new objects are validated along with their children
+        new = odml.Section(name="new")
+        odml.Section(name="subsub", type="type", parent=new)
+        sub.append(new)
+        engine.deliver(validate_partial(*engine.prepare_update()), engine.generation)
+        self.assertTrue(any(err.obj is new for err in engine.current.errors))
+
+        # objects of a discarded run are validated by the next one
+        sub.remove(new)
+        args = engine.prepare_update()
+        generation = engine.generation
+        sub.type = "type"
+        engine.deliver(validate_partial(*args), generation)
+        self.assertIsNone(engine.current)
+        self.assertIn(id(sub), engine.pending)
+
+        # removed objects drop their messages
+        engine.deliver(validate_partial(*engine.prepare_update()), engine.generation)
+        self.assertNotIn(id(new), engine.results)
+        self.assertNotIn(id(sub), engine.results)
+        self.assertFalse(any(err.obj is new for err in engine.current.errors))
+
+        # changes of top level sections validate the whole document
+        self.sec.name = "renamed"
+        self.assertTrue(engine.full)
+
+        engine.stop()
+
+    def test_single_run(self):
+        started = []
+
+        class Thread(object):
+            def __init__(self, target, daemon, args):
+                started.append(args)
+
+            def start(self):
+                pass
+
+        thread_class = background_validation.threading.Thread
+        background_validation.threading.Thread = Thread
+        self.addCleanup(setattr, background_validation.threading, "Thread", thread_class)
+
+        engine = BackgroundValidation(self.doc, [].append)
+        engine.start()
+        self.assertEqual(1, len(started))
+
+        # changes arriving meanwhile wait for the run in flight
+        self.prop.definition = "definition"
+        engine.start()
+        self.assertEqual(1, len(started))
+        self.assertTrue(engine.rerun)
+
+        engine.deliver(validate_snapshot(*started[0][:2]), started[0][-1])
+        self.assertEqual(2, len(started))
+        self.assertIsNone(engine.current)
+
+        engine.deliver(validate_snapshot(*started[1][:2]), started[1][-1])
+        self.assertEqual(2, len(started))
+        self.assertIsNotNone(engine.current)
+        engine.stop()
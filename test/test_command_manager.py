@@ -0,0 +1,115 @@
+"""
+Tests for the undo history of odmlui.command_manager.
+"""
+
+import unittest
+
+import odml
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities (Document, Section, Property).
+import odmlui.treemodel.mixin
+
+from odmlui import commands
+from odmlui.command_manager import CommandManager
+from odmlui.helpers import create_pseudo_values
+
+
+class TestCommandManager(unittest.TestCase):
+
+    def setUp(self):
+        self.doc = odml.Document()
+        self.sec = odml.Section(name="sec", parent=self.doc)
+
+    def rename(self, cmdm, name, merge=False):
+        if not merge:
+            cmdm.checkpoint()
+        cmdm.execute(commands.ChangeValue(object=self.sec, attr="name",
+                                          new_value=name))
+
+    def test_max_steps(self):
+        cmdm = CommandManager(max_undo_steps=3)
+        for i in range(5):
+            self.rename(cmdm, "name_%d" % i)
+
+        self.assertEqual(3, len(cmdm.undo_stack))
+        self.assertEqual(5, len(cmdm))
+        self.assertEqual(2, cmdm.evicted)
+
+        for _ in range(3):
+            cmdm.undo()
+        self.assertEqual("name_1", self.sec.name)
+        self.assertFalse(cmdm.can_undo)
+        self.assertTrue(cmdm.is_modified)
+        self.assertEqual(2, len(cmdm))
+
+    def test_max_size(self):
+        sub = odml.Section(name="sub", parent=self.sec)
+        for i in range(100):
+            odml.Property(name="prop_%d" % i, values=list(range(100)), parent=sub)
+
+        delete = commands.DeleteObject(obj=sub)
+        # as long as the section is part of the document it is not
+        # retained by the command
+        self.assertLess(delete.memory_size(), commands.node_size(sub))
+
+        cmdm = CommandManager(max_undo_size=commands.node_size(sub) * 10)
+        self.rename(cmdm, "renamed")
+        cmdm.execute(delete)
+        self.assertGreater(cmdm.undo_sizes[1], commands.node_size(sub))
+        # the removed section is counted once
+        self.assertLess(cmdm.undo_sizes[1], commands.node_size(sub) * 2)
+        self.assertEqual(2, len(cmdm.undo_stack))
+
+        # the first renaming is dropped to make room for the next one
+        cmdm.max_undo_size = cmdm.undo_size
+        self.rename(cmdm, "again")
+        self.assertEqual(2, len(cmdm.undo_stack))
+        self.assertIs(delete, cmdm.undo_stack[0])
+        cmdm.max_undo_size = 1
+        self.rename(cmdm, "last")
+        self.assertEqual(1, len(cmdm.undo_stack))
+        self.assertEqual(4, len(cmdm))
+
+        cmdm.reset()
+        self.assertEqual(0, len(cmdm))
+        self.assertEqual(0, cmdm.undo_size)
+
+    def test_merge(self):
+        cmdm = CommandManager()
+        for name in ("a", "ab", "abc"):
+            self.rename(cmdm, name, merge=True)
+        self.assertEqual(1, len(cmdm.undo_stack))
+        self.assertEqual("abc", cmdm.undo_stack[0].new_value)
+
+        # other attributes are not merged
+        cmdm.execute(commands.ChangeValue(object=self.sec, attr="type",
+                                          new_value="type"))
+        self.assertEqual(2, len(cmdm.undo_stack))
+
+        cmdm.undo()
+        cmdm.undo()
+        self.assertEqual("sec", self.sec.name)
+        cmdm.redo()
+        self.assertEqual("abc", self.sec.name)
+
+        # commands out of the merge window are kept separate
+        cmdm.merge_window = -1
+        self.rename(cmdm, "abcd", merge=True)
+        self.assertEqual(2, len(cmdm.undo_stack))
+
+    def test_set_property_value(self):
+        prop = odml.Property(name="prop", values=list(range(1000)), parent=self.sec)
+        create_pseudo_values([prop])
+        values = prop._values
+
+        cmdm = CommandManager()
+        cmdm.execute(commands.SetPropertyValue(prop=prop, index=500, new_value="42"))
+        self.assertEqual(42, prop.values[500])
+        self.assertIs(prop, self.sec.properties["prop"])
+        self.assertIs(values, prop._values)
+
+        cmdm.undo()
+        self.assertEqual(500, prop.values[500])
+        cmdm.redo()
+        self.assertEqual(42, prop.values[500])
@@ -0,0 +1,107 @@
+"""
+Tests for the parsed document cache of odmlui.document_cache.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import odml
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities (Document, Section, Property).
+import odmlui.treemodel.mixin
+
+from odmlui.document_cache import DocumentCache
+from odmlui.document_loader import load_document
+
+
+class TestDocumentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = DocumentCache(os.path.join(self.tmp_dir, "cache"))
+        self.file_path = os.path.join(self.tmp_dir, "doc.xml")
+        self.save("sec")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def save(self, name, file_path=None):
+        doc = odml.Document()
+        sec = odml.Section(name=name, type="test", parent=doc)
+        odml.Property(name="prop", values=[1, 2], parent=sec)
+        odml.save(doc, file_path or self.file_path, "XML")
+
+    def test_load(self):
+        key = self.cache.key(self.file_path)
+        self.assertIsNone(self.cache.load(key))
+
+        doc = load_document(self.file_path, "XML", cache=self.cache)
+        self.assertEqual(1, len(self.cache.entries()))
+
+        cached = load_document(self.file_path, "XML", cache=self.cache)
+        self.assertIsNot(doc, cached)
+        self.assertEqual(doc.sections[0].id, cached.sections[0].id)
+        prop = cached.sections["sec"].properties["prop"]
+        self.assertIs(prop, prop.pseudo_values[0].parent)
+
+        # a changed file gets a new key and is parsed again
+        self.save("changed")
+        self.assertNotEqual(key, self.cache.key(self.file_path))
+        doc = load_document(self.file_path, "XML", cache=self.cache)
+        self.assertEqual("changed", doc.sections[0].name)
+        self.assertEqual(2, len(self.cache.entries()))
+
+    def test_evict(self):
+        keys = []
+        for i in range(3):
+            file_path = os.path.join(self.tmp_dir, "doc_%d.xml" % i)
+            self.save("sec_%d" % i, file_path)
+            keys.append(self.cache.key(file_path))
+            self.cache.store(keys[-1], odml.load(file_path))
+            # the first entry is the most recently used one
+            os.utime(self.cache.entry_path(keys[0]), (i + 10, i + 10))
+            os.utime(self.cache.entry_path(keys[-1]), (i, i))
+
+        sizes = [size for _, size, _ in self.cache.entries()]
+        self.cache.max_size = sum(sizes) - 1
+        self.cache.evict()
+        self.assertEqual(2, len(self.cache.entries()))
+        self.assertIsNotNone(self.cache.load(keys[0]))
+        self.assertIsNone(self.cache.load(keys[1]))
+
+    def test_shared_directory(self):
+        os.makedirs(self.cache.directory)
+        os.chmod(self.cache.directory, 0o777)
+        key = self.cache.key(self.file_path)
+        self.cache.store(key, odml.load(self.file_path))
+        self.assertEqual([], self.cache.entries())
+        self.assertIsNone(self.cache.load(key))
+
+    def test_shared_parent(self):
+        parent = os.path.dirname(self.cache.directory)
+        os.makedirs(self.cache.directory, mode=0o700)
+        key = self.cache.key(self.file_path)
+        try:
+            # others could replace the cache directory
+            os.chmod(parent, 0o777)
+            self.cache.store(key, odml.load(self.file_path))
+            self.assertEqual([], self.cache.entries())
+
+            # unless the parent directory is sticky
+            os.chmod(parent, 0o1777)
+            self.cache.store(key, odml.load(self.file_path))
+            self.assertIsNotNone(self.cache.load(key))
+        finally:
+            os.chmod(parent, 0o700)
+
+    def test_version(self):
+        key = self.cache.key(self.file_path)
+        version = odml.__version__
+        odml.__version__ = version + ".dev"
+        try:
+            self.assertNotEqual(key, self.cache.key(self.file_path))
+        finally:
+            odml.__version__ = version
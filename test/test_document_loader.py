@@ -0,0 +1,101 @@
+"""
+Tests for loading documents with odmlui.document_loader.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+import odml
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities (Document, Section, Property).
+import odmlui.treemodel.mixin
+
+from odmlui.document_loader import LoadCancelled, create_process_pool, load_document
+
+
+class TestDocumentLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmp_dir, "doc.xml")
+
+        doc = odml.Document()
+        for name in ("first", "second"):
+            sec = odml.Section(name=name, type="test", parent=doc)
+            odml.Property(name="prop", values=[1, 2], parent=sec)
+            sub = odml.Section(name="sub", type="test", parent=sec)
+            odml.Property(name="prop", values=["a"], parent=sub)
+        odml.save(doc, self.file_path, "XML")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_load(self):
+        steps = []
+        doc = load_document(self.file_path, "XML",
+                            progress=lambda *args: steps.append(args))
+
+        self.assertEqual(["first", "second"], [sec.name for sec in doc.sections])
+        prop = doc.sections["second"].sections["sub"].properties["prop"]
+        self.assertEqual(1, len(prop.pseudo_values))
+        self.assertIs(prop, prop.pseudo_values[0].parent)
+
+        # the share of parsing follows the bytes read
+        fractions = [fraction for fraction, _ in steps]
+        self.assertEqual("Parsing", steps[0][1])
+        self.assertEqual(0.5, fractions[0])
+        self.assertEqual(fractions, sorted(fractions))
+        self.assertEqual([0.5, 0.5, 0.75, 1.0], fractions[-4:])
+        self.assertEqual("Resolving links", steps[-4][1])
+
+    def test_load_yaml(self):
+        file_path = os.path.join(self.tmp_dir, "doc.yaml")
+        odml.save(odml.load(self.file_path), file_path, "YAML")
+
+        steps = []
+        doc = load_document(file_path, "YAML", progress=lambda *args: steps.append(args))
+        self.assertEqual(["first", "second"], [sec.name for sec in doc.sections])
+        self.assertEqual((None, "Parsing"), steps[0])
+        self.assertEqual("doc.yaml", doc.origin_file_name)
+
+    def test_cancel(self):
+        cancelled = threading.Event()
+
+        def progress(fraction, text):
+            if fraction is not None:
+                cancelled.set()
+
+        # cancelled while parsing
+        self.assertRaises(LoadCancelled, load_document, self.file_path, "XML",
+                          progress, cancelled)
+
+        cancelled.clear()
+
+        def progress(fraction, text):
+            if text != "Parsing":
+                cancelled.set()
+
+        self.assertRaises(LoadCancelled, load_document, self.file_path, "XML",
+                          progress, cancelled)
+
+    def test_process_pool(self):
+        executor = create_process_pool(2)
+        if executor is None:
+            self.assertLess(sys.version_info, (3, 7))
+            return
+
+        try:
+            doc = executor.submit(load_document, self.file_path, "XML").result()
+        finally:
+            executor.shutdown()
+
+        sec = doc.sections["first"]
+        self.assertIs(doc, sec.parent)
+        prop = sec.properties["prop"]
+        self.assertEqual([1, 2], [val.pseudo_values for val in prop.pseudo_values])
+        self.assertIs(prop, prop.pseudo_values[1].parent)
@@ -0,0 +1,139 @@
+"""
+Tests for odmlui.treemodel.event.
+"""
+
+import unittest
+
+import odml
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities (Document, Section, Property).
+import odmlui.treemodel.mixin
+
+from odmlui.helpers import handle_section_import
+from odmlui.treemodel import event
+
+
+class TestQuiet(unittest.TestCase):
+
+    def setUp(self):
+        self.doc = odml.Document()
+        self.sec = odml.Section(name="sec", parent=self.doc)
+        self.prop = odml.Property(name="prop", values=[1, 2], parent=self.sec)
+        handle_section_import(self.sec)
+
+        self.events = []
+        self.doc.add_change_handler(self.on_change)
+
+    def on_change(self, context):
+        if context.pre_change:
+            return
+        self.events.append((context.action, context.obj))
+
+    def test_quiet(self):
+        with event.quiet(self.doc) as scope:
+            self.sec.name = "renamed"
+            self.prop.pseudo_values[0].pseudo_values = 3
+            sub = odml.Section(name="sub")
+            self.sec.append(sub)
+            self.assertEqual([], self.events)
+            # paths still follow structural changes
+            self.assertEqual((0, 0, 0), sub.to_path())
+
+        self.assertEqual(3, scope.suppressed)
+        self.assertEqual([("reset", self.doc)], self.events)
+
+        self.sec.name = "sec"
+        self.assertEqual(("set", self.sec), self.events[-1])
+
+    def test_nested(self):
+        with event.quiet(self.doc):
+            with event.quiet(self.doc):
+                self.sec.name = "renamed"
+            self.assertEqual([], self.events)
+        self.assertEqual([("reset", self.doc)], self.events)
+
+        # a quiet block without changes does not cause a reset
+        with event.quiet(self.doc):
+            pass
+        self.assertEqual(1, len(self.events))
+
+    def test_other_document(self):
+        other = odml.Document()
+        with event.quiet(other):
+            self.sec.name = "renamed"
+        self.assertEqual([("set", self.sec)], self.events)
+
+    def test_all_documents(self):
+        with event.quiet() as scope:
+            self.sec.name = "renamed"
+        self.assertEqual(1, scope.suppressed)
+        self.assertEqual([], self.events)
+
+
+class TestTransaction(unittest.TestCase):
+
+    def setUp(self):
+        self.doc = odml.Document()
+        self.sec = odml.Section(name="sec", parent=self.doc)
+        self.prop = odml.Property(name="prop", values=[1, 2], parent=self.sec)
+        handle_section_import(self.sec)
+
+        self.events = []
+        self.doc.add_change_handler(self.on_change)
+
+    def on_change(self, context):
+        self.events.append((context.action, context.pre_change, context.obj))
+
+    def test_coalesce(self):
+        with event.transaction(self.doc):
+            for i in range(10):
+                self.prop.pseudo_values[0].pseudo_values = i
+                self.prop.name = "prop_%d" % i
+            self.assertEqual([], self.events)
+
+        self.assertEqual([("set", False, self.prop.pseudo_values[0]),
+                          ("set", False, self.prop)], self.events)
+        self.assertEqual(9, self.prop.values[0])
+
+    def test_structural(self):
+        with event.transaction(self.doc):
+            sub = odml.Section(name="sub")
+            self.sec.append(sub)
+            self.assertEqual([("append", True, self.sec),
+                              ("append", False, self.sec)], self.events)
+
+            # changes of removed objects are not passed on
+            self.prop.unit = "mV"
+            self.sec.remove(self.prop)
+
+        self.assertEqual(4, len(self.events))
+
+    def test_nested(self):
+        with event.transaction(self.doc):
+            with event.transaction(self.doc):
+                self.sec.name = "a"
+            self.sec.name = "b"
+            self.assertEqual([], self.events)
+
+        self.assertEqual([("set", False, self.sec)], self.events)
+
+
+class TestChangeHandler(unittest.TestCase):
+
+    def test_actions(self):
+        doc = odml.Document()
+        sec = odml.Section(name="sec", parent=doc)
+
+        events = []
+        handler = lambda context: events.append(context.action)
+        doc.add_change_handler(handler, actions=("append",))
+
+        sec.name = "renamed"
+        self.assertEqual([], events)
+        sec.append(odml.Section(name="sub"))
+        self.assertEqual(["append", "append"], events)
+
+        doc.remove_change_handler(handler)
+        self.assertIsNone(doc._change_handler)
+        doc.remove_change_handler(handler)
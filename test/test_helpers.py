@@ -3,6 +3,8 @@ Tests for odmlui.helpers functions.
 """
 
 import os
+import shutil
+import tempfile
 import unittest
 
 import odml
@@ -100,3 +102,43 @@ class TestHelpers(unittest.TestCase):
         helpers.handle_property_import(prop_val)
         self.assertEqual(vals, prop_val.values)
         self.assertEqual("float", prop_val.dtype)
+
+    def test_unmerged_document(self):
+        doc = odml.Document()
+        sec = odml.Section(name="sec", type="test", parent=doc)
+        odml.Property(name="prop", values=[1, 2], parent=sec)
+        self.assertIs(doc, helpers.unmerged_document(doc))
+
+        linked = odml.Section(name="linked", type="test", parent=doc)
+        linked.link = "/sec"
+        helpers.handle_section_import(linked)
+        pseudo = linked.properties["prop"].pseudo_values
+
+        clone = helpers.unmerged_document(doc)
+        self.assertIsNot(doc, clone)
+        self.assertEqual(0, len(clone.sections["linked"].properties))
+        self.assertEqual("/sec", clone.sections["linked"].link)
+
+        # the document keeps its merged content
+        self.assertTrue(linked.is_merged)
+        self.assertIs(pseudo, linked.properties["prop"].pseudo_values)
+
+    def test_save_atomic(self):
+        tmp_dir = tempfile.mkdtemp()
+        file_path = os.path.join(tmp_dir, "doc.xml")
+        try:
+            doc = odml.Document()
+            odml.Section(name="sec", type="test", parent=doc)
+            helpers.save_atomic(doc, file_path, "XML")
+            self.assertEqual(["doc.xml"], os.listdir(tmp_dir))
+            self.assertEqual("sec", odml.load(file_path).sections[0].name)
+            # new files are created according to the umask
+            self.assertEqual(0o666 & ~helpers.current_umask(),
+                             os.stat(file_path).st_mode & 0o777)
+
+            # a failing save leaves the existing file untouched
+            self.assertRaises(Exception, helpers.save_atomic, doc, file_path, "NOPE")
+            self.assertEqual(["doc.xml"], os.listdir(tmp_dir))
+            self.assertEqual("sec", odml.load(file_path).sections[0].name)
+        finally:
+            shutil.rmtree(tmp_dir)
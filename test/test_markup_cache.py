@@ -0,0 +1,41 @@
+"""
+Tests for the rendered markup cache of the odmlui tree models.
+"""
+
+import unittest
+
+import odml
+
+from odmlui.treemodel.tree_model import MarkupCache
+
+
+class TestMarkupCache(unittest.TestCase):
+
+    def test_lru(self):
+        sec_a = odml.Section(name="a")
+        sec_b = odml.Section(name="b")
+        sec_c = odml.Section(name="c")
+
+        cache = MarkupCache(n_columns=2, size=2)
+        cache.set(sec_a, 0, "<b>a</b>")
+        cache.set(sec_b, 0, "<b>b</b>")
+        self.assertEqual("<b>a</b>", cache.get(sec_a, 0))
+        self.assertIsNone(cache.get(sec_a, 1))
+
+        # sec_b is the least recently used entry
+        cache.set(sec_c, 0, "<b>c</b>")
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get(sec_b, 0))
+        self.assertEqual("<b>a</b>", cache.get(sec_a, 0))
+        self.assertEqual("<b>c</b>", cache.get(sec_c, 0))
+
+    def test_invalidate(self):
+        sec = odml.Section(name="a")
+
+        cache = MarkupCache(n_columns=2, size=10)
+        cache.set(sec, 0, "a")
+        cache.set(sec, 1, "b")
+        cache.invalidate(sec)
+        self.assertIsNone(cache.get(sec, 0))
+        self.assertIsNone(cache.get(sec, 1))
+        self.assertEqual(0, len(cache))
@@ -0,0 +1,158 @@
+"""
+Tests for odmlui.treemodel.nodes path functionality.
+"""
+
+import gc
+import unittest
+import weakref
+
+import odml
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities (Document, Section, Property).
+import odmlui.treemodel.mixin
+
+from odmlui.helpers import handle_section_import
+from odmlui.treemodel import nodes
+
+
+class TestNodes(unittest.TestCase):
+
+    def setUp(self):
+        doc = odml.Document()
+        sec = odml.Section(name="sec", parent=doc)
+        for i in range(5):
+            odml.Section(name="sub_%d" % i, parent=sec)
+            odml.Property(name="prop_%d" % i, values=[1, 2, 3], parent=sec)
+
+        handle_section_import(sec)
+
+        self.doc = doc
+        self.sec = sec
+
+    def assert_positions(self):
+        for i, sub in enumerate(self.sec.sections):
+            self.assertEqual(i, sub.position)
+            self.assertEqual((0, 0, i), sub.to_path())
+
+        for i, prop in enumerate(self.sec.properties):
+            self.assertEqual(i, prop.position)
+            self.assertEqual((0, 1, i), prop.to_path())
+            for j, val in enumerate(prop.pseudo_values):
+                self.assertEqual((0, 1, i, j), val.to_path())
+
+    def test_identity_index(self):
+        val_a = ["1"]
+        val_b = ["1"]
+        items = [val_a, val_b]
+
+        index = nodes.IdentityIndex(items)
+        self.assertEqual(1, index.index(items, val_b))
+        self.assertEqual(0, index.index(items, val_a))
+        self.assertRaises(ValueError, index.index, items, ["1"])
+
+        # changes to the list bypassing the index are picked up
+        items.reverse()
+        self.assertEqual(0, index.index(items, val_b))
+
+        items.append(["2"])
+        index.appended(items)
+        self.assertEqual(2, index.index(items, items[2]))
+
+        # insert, remove and move patch the positions in place
+        val_c = ["3"]
+        items.insert(1, val_c)
+        index.inserted(items, val_c)
+        self.assertEqual([0, 1, 2, 3], [index._positions[id(item)] for item in items])
+        items.remove(val_b)
+        index.removed(items, val_b)
+        self.assertEqual([0, 1, 2], [index._positions[id(item)] for item in items])
+        items.insert(0, items.pop(2))
+        index.moved(items, items[0], 0)
+        self.assertEqual([0, 1, 2], [index._positions[id(item)] for item in items])
+        self.assertEqual(3, len(index._positions))
+
+    def test_path_to(self):
+        self.assert_positions()
+
+        # append, insert and remove
+        sub = self.sec.sections[1]
+        self.sec.remove(sub)
+        self.assert_positions()
+        self.sec.insert(0, sub)
+        self.assert_positions()
+        self.sec.append(odml.Section(name="new"))
+        self.assert_positions()
+
+        # reorder
+        self.sec.properties[0].reorder(3)
+        self.assert_positions()
+        self.sec.sections[4].reorder(0)
+        self.assert_positions()
+
+        # changes bypassing the event system are picked up by the
+        # child positions, memoized paths follow with the next event
+        self.sec.sections.reverse()
+        self.sec.properties.reverse()
+        for i, sub in enumerate(self.sec.sections):
+            self.assertEqual(i, sub.position)
+        for i, prop in enumerate(self.sec.properties):
+            self.assertEqual(i, prop.position)
+        self.sec.append(odml.Section(name="newer"))
+        self.sec.sections[0].reorder(0)
+        self.assert_positions()
+
+    def test_to_path_memoized(self):
+        deep = self.sec
+        for i in range(10):
+            deep = odml.Section(name="deep_%d" % i, parent=deep)
+        prop = odml.Property(name="deep_prop", values=[1], parent=deep)
+        handle_section_import(deep)
+
+        path = (0, 0, 5) + (0, 0) * 9 + (1, 0)
+        self.assertEqual(path, prop.to_path())
+        self.assertIs(prop.to_path(), prop.to_path())
+
+        # structural changes of any ancestor invalidate the memoized path
+        self.sec.sections[5].reorder(0)
+        self.assertEqual((0, 0, 0) + path[3:], prop.to_path())
+
+        # moving to a different parent
+        top = deep.parent.parent
+        deep.parent.remove(deep)
+        top.append(deep)
+        self.assertEqual((0, 0, 0) + path[3:-6] + (0, 1, 1, 0), prop.to_path())
+
+        self.assertEqual((1, 0), prop.to_path(deep))
+
+        # changes elsewhere keep the memoized path
+        cached = prop.to_path()
+        self.doc.append(odml.Section(name="other"))
+        deep.parent.append(odml.Section(name="sibling"))
+        self.assertIs(cached, prop.to_path())
+
+        # a memoized path is returned without walking up to the root
+        path_to = nodes.SectionNode.path_to
+        try:
+            nodes.SectionNode.path_to = None
+            self.assertIs(cached, prop.to_path())
+        finally:
+            nodes.SectionNode.path_to = path_to
+
+    def test_child_indices(self):
+        # a clone equals its original, but has indices of its own
+        clone = self.sec.clone(keep_id=True)
+        self.assertEqual(1, nodes.child_index(self.sec, "_sections", self.sec.sections[1]))
+        self.assertEqual(1, nodes.child_index(clone, "_sections", clone.sections[1]))
+        self.assertIsNot(nodes.get_child_indices(self.sec),
+                         nodes.get_child_indices(clone))
+
+        # the indices are dropped along with their node
+        ref = weakref.ref(clone)
+        del clone
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_path_to_missing(self):
+        prop = odml.Property(name="other")
+        self.assertRaises(ValueError, self.sec.path_to, prop)
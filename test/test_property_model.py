@@ -0,0 +1,98 @@
+"""
+Tests for the row notifications of odmlui.treemodel.property_model.
+"""
+
+import unittest
+
+import odml
+import odml.terminology
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities (Document, Section, Property).
+import odmlui.treemodel.mixin
+
+from odmlui import terminology_index
+from odmlui.helpers import handle_section_import
+from odmlui.treemodel.property_model import PropertyModel
+from odmlui.treemodel.value_model import Value
+
+
+class TestPropertyModel(unittest.TestCase):
+
+    def setUp(self):
+        doc = odml.Document()
+        sec = odml.Section(name="sec", parent=doc)
+        odml.Property(name="first", values=[1, 2, 3], parent=sec)
+        odml.Property(name="single", values=[1], parent=sec)
+        handle_section_import(sec)
+
+        self.sec = sec
+        self.model = PropertyModel(sec)
+        self.calls = []
+        for name in ("row_changed", "row_inserted", "row_deleted",
+                     "row_has_child_toggled"):
+            setattr(self.model, name, self.recorder(name))
+
+    def tearDown(self):
+        self.model.destroy()
+
+    def recorder(self, name):
+        def record(path, *args):
+            self.calls.append((name, tuple(path)))
+        return record
+
+    def test_single_to_multi(self):
+        prop = self.sec.properties["single"]
+        val = Value(prop)
+        val.pseudo_values = 2
+        prop.append(val)
+
+        self.assertIn(("row_inserted", (1, 0)), self.calls)
+        self.assertIn(("row_inserted", (1, 1)), self.calls)
+        self.assertIn(("row_has_child_toggled", (1,)), self.calls)
+        self.assertEqual((1, 1), self.model.get_node_path(val))
+
+        del self.calls[:]
+        prop.remove(val)
+        self.assertIn(("row_deleted", (1, 1)), self.calls)
+        self.assertIn(("row_deleted", (1, 0)), self.calls)
+        self.assertIn(("row_has_child_toggled", (1,)), self.calls)
+
+    def test_multi(self):
+        prop = self.sec.properties["first"]
+        val = Value(prop)
+        prop.insert(1, val)
+        self.assertIn(("row_inserted", (0, 1)), self.calls)
+        self.assertNotIn(("row_inserted", (0, 0)), self.calls)
+
+        del self.calls[:]
+        prop.remove(val)
+        self.assertEqual(["row_deleted"],
+                         [name for name, _ in self.calls if name != "row_changed"])
+        self.assertIn(("row_deleted", (0, 1)), self.calls)
+
+    def test_edit(self):
+        prop = self.sec.properties["first"]
+        prop.pseudo_values[2].pseudo_values = 42
+        self.assertEqual([("row_changed", (0, 2))], self.calls)
+
+    def test_markup_follows_terminology(self):
+        url = "file:///property_model_test.xml"
+        term = odml.Document()
+        term_sec = odml.Section(name="A", type="typeA", parent=term)
+        odml.Property(name="first", parent=term_sec)
+        odml.terminology.terminologies[url] = term
+        self.addCleanup(terminology_index.invalidate)
+        self.addCleanup(odml.terminology.terminologies.pop, url, None)
+
+        doc = self.sec.document
+        doc.repository = url
+        tree_iter = self.model.on_iter_nth_child(None, 0)
+        self.assertEqual("first", self.model.get_markup(tree_iter, 0))
+
+        # the terminology equivalent depends on the type of the section
+        # and the repository of the document
+        self.sec.type = "typeA"
+        self.assertEqual("<i>first</i>", self.model.get_markup(tree_iter, 0))
+        doc.repository = None
+        self.assertEqual("first", self.model.get_markup(tree_iter, 0))
@@ -0,0 +1,107 @@
+"""
+Tests for the gtk.TreeStore mirrors of odmlui.treemodel.store_model.
+"""
+
+import unittest
+
+import odml
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities (Document, Section, Property).
+import odmlui.treemodel.mixin
+
+from odmlui.helpers import handle_section_import
+from odmlui.treemodel.store_model import PropertyStore, SectionStore
+from odmlui.treemodel.value_model import Value
+
+
+class TestStoreModel(unittest.TestCase):
+
+    def setUp(self):
+        doc = odml.Document()
+        sec = odml.Section(name="sec", parent=doc)
+        for i in range(3):
+            sub = odml.Section(name="sub_%d" % i, parent=sec)
+            odml.Section(name="subsub", parent=sub)
+            odml.Property(name="prop_%d" % i, values=[1, 2, 3], parent=sec)
+        odml.Property(name="single", values=["a"], parent=sec)
+
+        handle_section_import(sec)
+
+        self.doc = doc
+        self.sec = sec
+
+    def rows(self, store, tree_iter=None):
+        """
+        returns the nested list of (name, [children]) of all rows below *tree_iter*
+        """
+        res = []
+        for i in range(store.iter_n_children(tree_iter)):
+            child = store.iter_nth_child(tree_iter, i)
+            res.append((store.get_object(child), self.rows(store, child)))
+        return res
+
+    def section_rows(self, sec):
+        return [(sub, self.section_rows(sub)) for sub in sec.sections]
+
+    def property_rows(self, sec):
+        res = []
+        for prop in sec.properties:
+            values = []
+            if len(prop.pseudo_values) > 1:
+                values = [(val, []) for val in prop.pseudo_values]
+            res.append((prop, values))
+        return res
+
+    def test_section_store(self):
+        store = SectionStore(self.doc)
+        self.assertEqual(self.section_rows(self.doc), self.rows(store))
+
+        sub = self.sec.sections[0]
+        self.assertEqual((0, 0), store.get_node_path(sub))
+        self.assertIs(sub, store.get_object(store.get_node_iter(sub)))
+
+        self.sec.remove(sub)
+        self.assertEqual(self.section_rows(self.doc), self.rows(store))
+        self.sec.insert(1, sub)
+        self.assertEqual(self.section_rows(self.doc), self.rows(store))
+        self.sec.sections[2].reorder(0)
+        self.assertEqual(self.section_rows(self.doc), self.rows(store))
+
+        sub.name = "renamed"
+        self.assertEqual("renamed", store.get_value(store.get_node_iter(sub), 0))
+
+        store.destroy()
+        self.sec.remove(sub)
+        self.assertNotEqual(self.section_rows(self.doc), self.rows(store))
+
+    def test_property_store(self):
+        store = PropertyStore(self.sec)
+        self.assertEqual(self.property_rows(self.sec), self.rows(store))
+
+        prop = self.sec.properties[0]
+        self.assertEqual((0, 2), store.get_node_path(prop.pseudo_values[2]))
+        single = self.sec.properties["single"]
+        self.assertEqual((3,), store.get_node_path(single.pseudo_values[0]))
+
+        self.sec.remove(prop)
+        self.assertEqual(self.property_rows(self.sec), self.rows(store))
+        self.sec.append(prop)
+        self.assertEqual(self.property_rows(self.sec), self.rows(store))
+
+        # remove values until a single one is displayed inline
+        prop.remove(prop.pseudo_values[0])
+        self.assertEqual(self.property_rows(self.sec), self.rows(store))
+        prop.remove(prop.pseudo_values[0])
+        self.assertEqual(self.property_rows(self.sec), self.rows(store))
+
+        val = prop.pseudo_values[0]
+        val.pseudo_values = 42
+        self.assertEqual("42", store.get_value(store.get_node_iter(prop), 1))
+
+        # add values until they are displayed in rows of their own
+        for i in range(3):
+            prop.insert(0, Value(prop))
+            self.assertEqual(self.property_rows(self.sec), self.rows(store))
+
+        store.destroy()
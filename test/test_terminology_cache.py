@@ -0,0 +1,98 @@
+"""
+Tests for refreshing terminologies with odmlui.terminology_cache.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import odml
+import odml.terminology
+
+from odmlui.helpers import path_to_uri
+from odmlui import terminology_cache, terminology_index
+
+
+class TestTerminologyCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+        repository = odml.Document()
+        for i in range(3):
+            file_path = os.path.join(self.tmp_dir, "term_%d.xml" % i)
+            if i < 2:
+                term = odml.Document()
+                odml.Section(name="term_%d" % i, type="test", parent=term)
+                odml.save(term, file_path, "XML")
+            sec = odml.Section(name="include_%d" % i, type="test", parent=repository)
+            sec._include = path_to_uri(file_path)
+        self.url = path_to_uri(os.path.join(self.tmp_dir, "terminologies.xml"))
+        odml.save(repository, os.path.join(self.tmp_dir, "terminologies.xml"), "XML")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_refresh_repository(self):
+        steps = []
+        failures = terminology_cache.refresh_repository(
+            self.url, lambda *args: steps.append(args), max_workers=2)
+
+        self.assertEqual([path_to_uri(os.path.join(self.tmp_dir, "term_2.xml"))],
+                         list(failures))
+        self.assertEqual([1, 2, 3, 4], [done for done, _, _ in steps])
+        self.assertTrue(all(total == 4 for _, total, _ in steps))
+
+        include = path_to_uri(os.path.join(self.tmp_dir, "term_1.xml"))
+        self.assertEqual("term_1",
+                         odml.terminology.terminologies[include].sections[0].name)
+
+    def test_missing_repository(self):
+        url = path_to_uri(os.path.join(self.tmp_dir, "missing.xml"))
+        self.assertEqual([url], list(terminology_cache.refresh_repository(url)))
+
+    def test_repository_error(self):
+        def cache_load(url, replace_file=False):
+            raise OSError("Cache not writable")
+
+        load = odml.terminology.cache_load
+        odml.terminology.cache_load = cache_load
+        try:
+            failures = terminology_cache.refresh_repository(self.url)
+        finally:
+            odml.terminology.cache_load = load
+        self.assertEqual([self.url], list(failures))
+        self.assertIsInstance(failures[self.url], OSError)
+
+    def test_read_repository(self):
+        doc = odml.Document()
+        # not set via the property, which starts downloading it
+        doc._repository = "https://example.org/terms.xml"
+        odml.Section(name="sec", type="test", parent=doc)
+        for parser in ("XML", "YAML", "JSON"):
+            file_path = os.path.join(self.tmp_dir, "doc.%s" % parser.lower())
+            odml.save(doc, file_path, parser)
+            self.assertEqual("https://example.org/terms.xml",
+                             terminology_cache.read_repository(file_path))
+
+        self.assertIsNone(terminology_cache.read_repository(
+            os.path.join(self.tmp_dir, "term_0.xml")))
+
+    def test_warm_up(self):
+        include = path_to_uri(os.path.join(self.tmp_dir, "term_0.xml"))
+        doc = odml.Document()
+        sec = odml.Section(name="sec", type="test", parent=doc)
+        sec._repository = include
+        self.assertEqual([include], terminology_cache.document_repositories(doc))
+
+        odml.terminology.terminologies.pop(include, None)
+        terminology_index.loading.add(include)
+        try:
+            # the views do not wait for terminologies loaded in the background
+            self.assertIsNone(terminology_index.terminology_equivalent(sec))
+            self.assertTrue(terminology_cache.warm_up(include))
+            self.assertNotIn(include, terminology_index.loading)
+            self.assertEqual("term_0", terminology_index.terminology_equivalent(sec).name)
+        finally:
+            terminology_index.invalidate()
@@ -0,0 +1,99 @@
+"""
+Tests for the terminology lookups of odmlui.terminology_index.
+"""
+
+import unittest
+
+import odml
+import odml.terminology
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities (Document, Section, Property).
+import odmlui.treemodel.mixin
+
+from odmlui import terminology_index
+
+
+class TestTerminologyIndex(unittest.TestCase):
+    url = "file:///terminology_index_test.xml"
+
+    def setUp(self):
+        term = odml.Document()
+        for name, sec_type in (("A", "setup"), ("B", "Subject")):
+            sec = odml.Section(name=name, type=sec_type, parent=term)
+            odml.Property(name="prop", values=["term"], parent=sec)
+            sub = odml.Section(name="sub", type="subject", parent=sec)
+            odml.Property(name="sub_prop", values=[1], parent=sub)
+        odml.terminology.terminologies[self.url] = term
+        self.term = term
+
+        doc = odml.Document(repository=self.url)
+        for name, sec_type in (("s1", "subject"), ("s2", "setup"), ("s3", "none")):
+            sec = odml.Section(name=name, type=sec_type, parent=doc)
+            odml.Property(name="prop", parent=sec)
+            odml.Property(name="sub_prop", parent=sec)
+        self.doc = doc
+
+    def tearDown(self):
+        odml.terminology.terminologies.pop(self.url, None)
+        terminology_index.invalidate()
+
+    def test_equivalent(self):
+        objects = [self.doc]
+        for sec in self.doc.sections:
+            objects.append(sec)
+            objects.extend(sec.properties)
+
+        for obj in objects:
+            self.assertIs(obj.get_terminology_equivalent(),
+                          terminology_index.terminology_equivalent(obj))
+
+        self.assertIs(self.term.sections["A"].sections["sub"],
+                      terminology_index.terminology_equivalent(self.doc.sections["s1"]))
+        self.assertEqual(["sub", "B", "sub"],
+                         [sec.name for sec in
+                          terminology_index.get_index(self.url).candidates("SUBJECT")])
+
+    def test_reload(self):
+        index = terminology_index.get_index(self.url)
+        self.assertIs(index, terminology_index.get_index(self.url))
+
+        generation = terminology_index.generation
+        terminology_index.invalidate()
+        self.assertGreater(terminology_index.generation, generation)
+        self.assertIsNot(index, terminology_index.get_index(self.url))
+
+        # a reloaded terminology is indexed again
+        term = self.term.clone()
+        odml.terminology.terminologies[self.url] = term
+        self.assertIs(term, terminology_index.get_index(self.url).term)
+
+    def test_merged(self):
+        sec = self.doc.sections["s2"]
+        sec.merge(self.term.sections["A"], strict=False)
+        prop = sec.properties["prop"]
+        self.assertIs(prop.get_merged_equivalent(),
+                      terminology_index.merged_equivalent(prop))
+        self.assertIsNotNone(terminology_index.merged_equivalent(prop))
+
+    def test_failed(self):
+        url = "file:///terminology_index_missing.xml"
+        loads = []
+        load = odml.terminology.load
+
+        def counting_load(url):
+            loads.append(url)
+            return load(url)
+
+        odml.terminology.load = counting_load
+        try:
+            self.assertIsNone(terminology_index.get_index(url))
+            self.assertIsNone(terminology_index.get_index(url))
+            self.assertEqual([url], loads)
+
+            # failures are retried once invalidated
+            terminology_index.invalidate()
+            self.assertIsNone(terminology_index.get_index(url))
+            self.assertEqual([url, url], loads)
+        finally:
+            odml.terminology.load = load
@@ -0,0 +1,60 @@
+"""
+Tests for odmlui.validation_index class.
+"""
+
+import unittest
+
+import odml
+import odml.validation
+
+from odmlui.validation_index import ValidationIndex
+
+
+class TestValidationIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.doc = odml.Document()
+        self.sec = odml.Section(name="sec", parent=self.doc)
+        self.prop = odml.Property(name="prop", parent=self.sec)
+
+    def test_index(self):
+        validation = odml.validation.Validation(self.doc)
+        index = ValidationIndex(validation)
+
+        self.assertEqual(validation[self.sec], index[self.sec])
+        self.assertEqual(validation[self.prop], index[self.prop])
+        self.assertEqual([], index[self.doc])
+
+        self.assertEqual(ValidationIndex.WARNING, index.severity(self.sec))
+        self.assertEqual(-1, index.severity(self.doc))
+
+    def test_severity(self):
+        validation = odml.validation.Validation(self.doc)
+        index = ValidationIndex(validation)
+
+        warning = odml.validation.ValidationError(self.doc, "warning", "warning")
+        index.add(warning)
+        self.assertEqual(ValidationIndex.WARNING, index.severity(self.doc))
+
+        error = odml.validation.ValidationError(self.doc, "error", "error")
+        index.add(error)
+        self.assertEqual(ValidationIndex.ERROR, index.severity(self.doc))
+
+        # the highest severity is kept
+        index.add(warning)
+        self.assertEqual(ValidationIndex.ERROR, index.severity(self.doc))
+        self.assertEqual([warning, error, warning], index[self.doc])
+
+    def test_changed(self):
+        index = ValidationIndex(odml.validation.Validation(self.doc))
+        self.assertEqual([], index.changed(ValidationIndex(
+            odml.validation.Validation(self.doc))))
+
+        # the section gets a type, the property stays unchanged
+        self.sec.type = "test"
+        changed = index.changed(ValidationIndex(odml.validation.Validation(self.doc)))
+        self.assertEqual([self.sec], changed)
+
+        sec = odml.Section(name="new", parent=self.doc)
+        changed = index.changed(ValidationIndex(odml.validation.Validation(self.doc)))
+        self.assertEqual({id(self.sec), id(sec)}, set(id(obj) for obj in changed))
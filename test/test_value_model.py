@@ -0,0 +1,107 @@
+"""
+Tests for odmlui.treemodel.value_model.
+"""
+
+import unittest
+
+import odml
+
+# Import is required to use the event capable odmlui implementation
+# of odml entities (Document, Section, Property).
+import odmlui.treemodel.mixin
+
+from odmlui.helpers import create_pseudo_values
+from odmlui.treemodel.value_model import PseudoValues, Value
+
+
+class TestPseudoValues(unittest.TestCase):
+
+    def setUp(self):
+        self.prop = odml.Property(name="prop", values=list(range(1000)))
+        create_pseudo_values([self.prop])
+
+    def test_lazy(self):
+        pseudo = self.prop.pseudo_values
+        self.assertIsInstance(pseudo, PseudoValues)
+        self.assertEqual(1000, len(pseudo))
+        self.assertEqual([], pseudo.materialized())
+
+        val = pseudo[500]
+        self.assertIsInstance(val, Value)
+        self.assertEqual(500, val.pseudo_values)
+        self.assertIs(val, pseudo[500])
+        self.assertIs(pseudo[999], pseudo[-1])
+        self.assertEqual(2, len(pseudo.materialized()))
+        self.assertEqual([997, 998], [v.pseudo_values for v in pseudo[997:999]])
+
+        self.assertRaises(IndexError, pseudo.__getitem__, 1000)
+        self.assertEqual(500, pseudo.index(val))
+        self.assertRaises(ValueError, pseudo.index, Value(self.prop, 500))
+
+    def test_remove(self):
+        pseudo = self.prop.pseudo_values
+        first = pseudo[0]
+        val = pseudo[500]
+
+        self.prop.remove(first)
+        self.assertEqual(999, len(pseudo))
+        self.assertEqual(999, len(self.prop.values))
+        self.assertIs(val, pseudo[499])
+        self.assertEqual(499, val.index)
+        self.assertEqual(500, val.pseudo_values)
+        self.assertEqual(1, pseudo[0].pseudo_values)
+
+    def test_append(self):
+        pseudo = self.prop.pseudo_values
+        val = Value(self.prop)
+        val.pseudo_values = "42"
+        self.assertEqual(1000, len(pseudo))
+        self.assertEqual(1000, len(self.prop.values))
+
+        self.prop.append(val)
+        self.assertEqual(1001, len(pseudo))
+        self.assertIs(val, pseudo[1000])
+        self.assertEqual(42, self.prop.values[1000])
+        self.assertEqual((1000,), self.prop.path_to(val))
+
+        # a removed value keeps its content and can be added again
+        self.prop.remove(val)
+        self.assertEqual(1000, len(self.prop.values))
+        self.assertEqual(42, val.pseudo_values)
+        self.prop.append(val)
+        self.assertEqual(42, self.prop.values[1000])
+
+    def test_insert(self):
+        pseudo = self.prop.pseudo_values
+        second = pseudo[1]
+        val = Value(self.prop)
+        val.pseudo_values = 42
+
+        self.prop.insert(1, val)
+        self.assertEqual(1001, len(pseudo))
+        self.assertIs(val, pseudo[1])
+        self.assertIs(second, pseudo[2])
+        self.assertEqual(2, second.index)
+        self.assertEqual([0, 42, 1], self.prop.values[:3])
+
+    def test_set_in_place(self):
+        values = self.prop._values
+        val = self.prop.pseudo_values[10]
+
+        val.pseudo_values = "42"
+        self.assertIs(values, self.prop._values)
+        self.assertEqual(42, self.prop.values[10])
+
+        self.assertRaises(ValueError, setattr, val, "pseudo_values", "text")
+        self.assertEqual(42, self.prop.values[10])
+
+    def test_reorder(self):
+        prop = odml.Property(name="prop", values=[0, 1, 2, 3])
+        create_pseudo_values([prop])
+        values = prop._values
+
+        prop.pseudo_values[0].reorder(3)
+        self.assertEqual([1, 2, 0, 3], prop.values)
+        prop.pseudo_values[3].reorder(0)
+        self.assertEqual([3, 1, 2, 0], prop.values)
+        self.assertIs(values, prop._values)